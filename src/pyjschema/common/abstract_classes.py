@@ -13,6 +13,8 @@ class AValidator(abc.ABC):
     id = None  # and remove this line
     base_uri = None
     anchor = None
+    # other locations of the same subschema when identical subschemas share a validator
+    aliases: typing.Tuple[str, ...] = ()
 
     def __init__(self, schema: typing.Dict, location, parent):
         schema = {} if isinstance(schema, bool) else schema
@@ -32,6 +34,13 @@ class AValidator(abc.ABC):
     def __call__(self, instance: JsonType, location) -> bool:
         raise NotImplementedError
 
+    def is_valid(self, instance: JsonType) -> bool:
+        """
+        Returns whether the instance is valid without building ValidationResults.
+        Validators should override this so that it returns as soon as the answer is known.
+        """
+        return bool(self(instance=instance, location=""))
+
     def sub_validators(self) -> typing.Iterable["AValidator"]:
         yield from []
 
@@ -46,6 +55,13 @@ class KeywordGroup(AValidator):
     def sub_validators(self) -> typing.Iterable["AValidator"]:
         raise NotImplementedError
 
+    def absorb(self, validators: typing.Dict[str, "AValidator"]) -> typing.Iterable[str]:
+        """
+        Called once every keyword of the schema is built, a group can take over other keywords that it checks
+        better together with its own. Returns the keys of the ones it took over.
+        """
+        return ()
+
     def __eq__(self, other):
         return isinstance(other, self.__class__) and self.location == other.location
 
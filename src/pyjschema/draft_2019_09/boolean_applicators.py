@@ -1,8 +1,15 @@
-from itertools import filterfalse
+import typing
 
-from pyjschema.common import Keyword, KeywordGroup
+from pyjschema.common import AValidator, Keyword, KeywordGroup
 from pyjschema.draft_2019_09.context import BUILD_VALIDATOR
-from pyjschema.utils import ValidationResult
+from pyjschema.utils import collect_failures, ValidationResult
+
+from .ref import Ref
+from .types.primitives import canonical
+from .types.type_ import NAME_TO_TYPE, isinstance_
+from .validator import Validator
+
+_MISSING = object()
 
 
 class IfElseThen(KeywordGroup):
@@ -35,7 +42,8 @@ class IfElseThen(KeywordGroup):
             return True
 
         res = True
-        if self._if_validator(instance=instance, location=location):
+        # the result of if is never reported so there is no need for the details
+        if self._if_validator.is_valid(instance=instance):
             if self._then_validator:
                 res = self._then_validator(
                     instance=instance, location=location
@@ -56,6 +64,13 @@ class IfElseThen(KeywordGroup):
             )
         )
 
+    def is_valid(self, instance):
+        if not self._if_validator:
+            return True
+        if self._if_validator.is_valid(instance=instance):
+            return self._then_validator.is_valid(instance=instance) if self._then_validator else True
+        return self._else_validator.is_valid(instance=instance) if self._else_validator else True
+
     def sub_validators(self):
         if self._if_validator:
             yield self._if_validator
@@ -76,33 +91,128 @@ class AllOf(Keyword):
             build_validator(schema=item, location=f"{self.location}", parent=self)
             for item in self.value
         ]
+        self._chain: typing.Optional[_IfChain] = None
 
     def __call__(self, instance, location):
-        results = filterfalse(
-            bool,
-            (
-                validator(instance=instance, location=location)
-                for validator in self._validators
-            ),
+        if self.is_valid(instance=instance):
+            return True
+        # the subschemas the chain skips have no branch that applies to the instance so they would pass anyway
+        results = collect_failures(
+            self._validators[index](instance=instance, location=location)
+            for index, _ in self._applicable(instance)
         )  # this location is probably wrong
-        results = list(results)
-        return (
-            True
-            if not results
-            else ValidationResult(
-                message="failed allOf",
-                keywordLocation=self.location,
-                location=location,
-                sub_results=[results],
-            )
+        return ValidationResult(
+            message="failed allOf",
+            keywordLocation=self.location,
+            location=location,
+            sub_results=[results],
         )
 
+    def is_valid(self, instance):
+        for _, validator in self._applicable(instance):
+            if not validator.is_valid(instance=instance):
+                return False
+        return True
+
+    def _applicable(self, instance) -> typing.Tuple[typing.Tuple[int, AValidator], ...]:
+        if self._chain is None:
+            # built on first use so that it sees the subschemas after the optimizer has been through them
+            self._chain = _IfChain(self._validators)
+        return self._chain.applicable(instance)
+
     def sub_validators(self):
         yield from self._validators
 
 
-class OneOf(Keyword):
-    keyword = "oneOf"
+class _IfChain:
+    """
+    allOf: [{if: {properties: {kind: {const: X}}}, then: ...}, ...] is a chain of if/then/else on the value of
+    one property. The branch each of them takes is worked out once per value so an object only runs the then or
+    else that applies instead of every if. Every other subschema of the allOf always runs.
+    """
+
+    def __init__(self, validators: typing.Sequence[AValidator]):
+        self._validators = validators
+        self._everything = tuple((index, validator) for index, validator in enumerate(validators))
+        self._conditions = [_if_condition(validator) for validator in validators]
+        counts: typing.Dict[str, int] = {}
+        for condition in self._conditions:
+            if condition is not None:
+                counts[condition.name] = counts.get(condition.name, 0) + 1
+        tag = max(counts, key=counts.__getitem__) if counts else None
+        self.tag = tag if tag is not None and counts[tag] > 1 else None
+        self._by_value: typing.Dict[typing.Hashable, typing.Tuple[typing.Tuple[int, AValidator], ...]] = {}
+        if self.tag is None:
+            return
+        self._missing = self._branches(_MISSING)
+        # a value none of the ifs allow
+        self._other = self._branches(object())
+        for condition in self._conditions:
+            if condition is not None and condition.name == self.tag:
+                for value in condition.values:
+                    if value not in self._by_value:
+                        self._by_value[value] = self._branches(value)
+
+    def applicable(self, instance) -> typing.Tuple[typing.Tuple[int, AValidator], ...]:
+        "the index of each subschema that has to be checked and the validator that checks it"
+        if self.tag is None or type(instance) is not dict:
+            return self._everything
+        value = instance.get(self.tag, _MISSING)
+        if value is _MISSING:
+            return self._missing
+        return self._by_value.get(canonical(value), self._other)
+
+    def _branches(self, value):
+        "the branches for objects with this canonical value of the tag or without it for _MISSING"
+        branches = []
+        for index, validator in enumerate(self._validators):
+            condition = self._conditions[index]
+            if condition is None or condition.name != self.tag:
+                branches.append((index, validator))
+                continue
+            if_else_then = condition.if_else_then
+            if_passes = not condition.required if value is _MISSING else value in condition.values
+            branch = if_else_then._then_validator if if_passes else if_else_then._else_validator
+            if branch is not None:
+                branches.append((index, branch))
+        return tuple(branches)
+
+
+class _IfCondition(typing.NamedTuple):
+    "an if whose schema only checks the value of one property"
+    name: str
+    # the canonical values it can have
+    values: typing.FrozenSet
+    required: bool
+    if_else_then: IfElseThen
+
+
+def _if_condition(validator: AValidator) -> typing.Optional[_IfCondition]:
+    "the condition of a subschema that is only such an if, None for any other subschema"
+    if not isinstance(validator, Validator) or len(validator._validators) != 1:
+        return None
+    (if_else_then,) = validator._validators.values()
+    if not isinstance(if_else_then, IfElseThen) or not isinstance(if_else_then._if_validator, Validator):
+        # if: true and if: false are built as AcceptAll and RejectAll which don't have a schema to look at
+        return None
+    schema = if_else_then._if_validator.schema
+    if not isinstance(schema, dict):
+        return None
+    properties = schema.get("properties")
+    if set(schema) - {"properties", "required"} or not isinstance(properties, dict) or len(properties) != 1:
+        return None
+    ((name, subschema),) = properties.items()
+    if not isinstance(subschema, dict) or set(subschema) - {"const", "enum"}:
+        return None
+    values = _allowed_values(subschema)
+    required = schema.get("required", [])
+    if values is None or required not in ([], [name]):
+        return None
+    return _IfCondition(name=name, values=values, required=bool(required), if_else_then=if_else_then)
+
+
+class _Union(Keyword):
+    "the branches of oneOf and anyOf, only the ones the discriminator picks out for an instance are run"
 
     def __init__(self, schema: dict, location, parent):
         super().__init__(schema=schema, location=location, parent=parent)
@@ -112,63 +222,201 @@ class OneOf(Keyword):
             build_validator(schema=item, location=self.location, parent=self)
             for item in self.value
         ]
+        self._discriminator: typing.Optional[_Discriminator] = None
+
+    def _candidates(self, instance) -> typing.Sequence[int]:
+        if self._discriminator is None:
+            # built on first use since the branches that are a $ref are only resolved after the whole schema is built
+            self._discriminator = _Discriminator(self._validators)
+        return self._discriminator.candidates(instance)
+
+    def sub_validators(self):
+        yield from self._validators
+
+
+class OneOf(_Union):
+    keyword = "oneOf"
 
     def __call__(self, instance, location):
-        results = list(
-            filterfalse(
-                bool,
-                (
-                    validator(instance=instance, location=location)
-                    for validator in self._validators
-                ),  # this location is probably wrong
-            )
-        )
-        return (
-            True
-            if len(results) == (len(self._validators) - 1)
-            else ValidationResult(
-                message="failed oneOf",
-                keywordLocation=self.location,
-                location=location,
-                sub_results=results,
-            )
+        # the failures of the other subschemas aren't reported when one passes so only is_valid is needed to
+        # find it - and to stop at a second one
+        candidates = self._candidates(instance)
+        passed = []
+        for index in candidates:
+            if self._validators[index].is_valid(instance=instance):
+                passed.append(index)
+                if len(passed) > 1:
+                    return ValidationResult(
+                        message=f"failed oneOf, the subschemas at {passed[0]} and {passed[1]} both match",
+                        keywordLocation=self.location,
+                        location=location,
+                    )
+        if passed:
+            return True
+        return ValidationResult(
+            message="failed oneOf",
+            keywordLocation=self.location,
+            location=location,
+            sub_results=collect_failures(
+                self._validators[index](instance=instance, location=location)
+                for index in (candidates or range(len(self._validators)))
+            ),  # this location is probably wrong
         )
 
+    def is_valid(self, instance):
+        count = 0
+        for index in self._candidates(instance):
+            if self._validators[index].is_valid(instance=instance):
+                count += 1
+                if count > 1:
+                    return False
+        return count == 1
+
 
-class AnyOf(Keyword):
+class AnyOf(_Union):
     keyword = "anyOf"
 
-    def __init__(self, schema: dict, location, parent):
-        super().__init__(schema=schema, location=location, parent=parent)
-        build_validator = BUILD_VALIDATOR.get()
+    def __call__(self, instance, location):
+        # stops at the first subschema that passes, the failures of the others would be thrown away
+        if self.is_valid(instance=instance):
+            return True
+        candidates = self._candidates(instance)
+        return ValidationResult(
+            message="failed AnyOf",
+            keywordLocation=self.location,
+            location=location,
+            sub_results=collect_failures(
+                self._validators[index](instance=instance, location=location)
+                for index in (candidates or range(len(self._validators)))
+            ),  # this location is probably wrong
+        )
 
-        self._validators = [
-            build_validator(schema=item, location=f"{self.location}", parent=self)
-            for item in self.value
-        ]
+    def is_valid(self, instance):
+        validators = self._validators
+        for index in self._candidates(instance):
+            if validators[index].is_valid(instance=instance):
+                return True
+        return False
 
-    def __call__(self, instance, location):
-        results = filterfalse(
-            bool,
-            (
-                validator(instance=instance, location=location)
-                for validator in self._validators
-            ),
-        )  # this location is probably wrong
-        results = list(results)
-        return (
-            True
-            if len(results) < len(self._validators)
-            else ValidationResult(
-                message="failed AnyOf",
-                keywordLocation=self.location,
-                location=location,
-                sub_results=results,
+
+class _Discriminator:
+    """
+    Works out which branches of a oneOf or anyOf can pass for an instance without running them.
+    A branch can only pass if the instance has one of the types it allows and, for a tagged union, if the
+    tag property is one of the values its const or enum allows. The tag is the property with a const or enum in
+    the most branches. Objects are looked up by the value of their tag, other instances by their type.
+    """
+
+    def __init__(self, validators: typing.Sequence[AValidator]):
+        guards = [_Guard(validator) for validator in validators]
+        everything = tuple(range(len(validators)))
+        self._all: typing.Optional[typing.Tuple[int, ...]] = everything
+        self._guards = guards
+        self._by_type: typing.Dict[type, typing.Tuple[int, ...]] = {}
+        self.tag = _tag(guards)
+        if self.tag is None and not any(guard.types for guard in guards):
+            return
+        self._all = None
+        if self.tag is None:
+            return
+        objects = [index for index in everything if guards[index].allows({})]
+        self._untagged = tuple(index for index in objects if self.tag not in guards[index].tags)
+        self._without_tag = tuple(index for index in objects if self.tag not in guards[index].required)
+        tagged: typing.Dict[typing.Hashable, typing.List[int]] = {}
+        for index in objects:
+            for value in guards[index].tags.get(self.tag, ()):
+                tagged.setdefault(value, []).append(index)
+        self._by_tag = {
+            value: tuple(sorted(set(indexes) | set(self._untagged))) for value, indexes in tagged.items()
+        }
+
+    def candidates(self, instance) -> typing.Tuple[int, ...]:
+        "the indexes of the branches that can pass, in order"
+        if self._all is not None:
+            return self._all
+        type_ = type(instance)
+        if type_ is dict and self.tag is not None:
+            value = instance.get(self.tag, _MISSING)
+            if value is _MISSING:
+                return self._without_tag
+            return self._by_tag.get(canonical(value), self._untagged)
+        candidates = self._by_type.get(type_)
+        if candidates is None:
+            # whether a branch allows an instance only depends on its type so this is worked out once per type
+            candidates = self._by_type[type_] = tuple(
+                index for index, guard in enumerate(self._guards) if guard.allows(instance)
             )
+        return candidates
+
+
+class _Guard:
+    """
+    What a subschema requires of the instance - found in its own keywords, the subschema its $ref points to and
+    the subschemas of its allOf since the instance has to pass all of them
+    """
+
+    def __init__(self, validator: AValidator):
+        # every one of these lists of type names has to allow the instance
+        self.types: typing.List[typing.List[str]] = []
+        # property -> the canonical values it can have
+        self.tags: typing.Dict[str, typing.FrozenSet] = {}
+        self.required: typing.Set[str] = set()
+        self._add(validator, seen=set())
+
+    def allows(self, instance) -> bool:
+        return all(
+            any(isinstance_(instance, NAME_TO_TYPE[name]) for name in names) for names in self.types
         )
 
-    def sub_validators(self):
-        yield from self._validators
+    def _add(self, validator: typing.Optional[AValidator], seen: typing.Set[int]):
+        # the true and false the optimizer puts in place of a subschema don't require anything that helps here
+        if not isinstance(validator, Validator) or id(validator) in seen:
+            return
+        seen.add(id(validator))
+        schema = validator.schema
+        types = schema.get("type")
+        if types is not None:
+            self.types.append([types] if isinstance(types, str) else types)
+        required = schema.get("required")
+        if isinstance(required, list):
+            self.required.update(required)
+        properties = schema.get("properties")
+        for name, subschema in (properties.items() if isinstance(properties, dict) else ()):
+            values = _allowed_values(subschema)
+            if values is not None:
+                self.tags[name] = self.tags[name] & values if name in self.tags else values
+        ref = validator._validators.get("$ref")
+        # a $ref is either resolved or the validator it points to was inlined in its place
+        self._add(ref._validator if isinstance(ref, Ref) else ref, seen)
+        all_of = validator._validators.get("allOf")
+        if isinstance(all_of, AllOf):
+            for sub_validator in all_of._validators:
+                self._add(sub_validator, seen)
+
+
+def _allowed_values(schema) -> typing.Optional[typing.FrozenSet]:
+    "the canonical values a const or enum allows, None if neither is there"
+    if not isinstance(schema, dict):
+        return None
+    values = None
+    if "const" in schema:
+        values = frozenset([canonical(schema["const"])])
+    if isinstance(schema.get("enum"), list):
+        enum = frozenset(canonical(value) for value in schema["enum"])
+        values = enum if values is None else values & enum
+    return values
+
+
+def _tag(guards: typing.Sequence[_Guard]) -> typing.Optional[str]:
+    "the property with a const or enum in the most branches - at least two of them, otherwise it doesn't tell them apart"
+    counts: typing.Dict[str, int] = {}
+    for guard in guards:
+        for name in guard.tags:
+            counts[name] = counts.get(name, 0) + 1
+    if not counts:
+        return None
+    tag = max(counts, key=counts.__getitem__)
+    return tag if counts[tag] > 1 else None
 
 
 class Not(Keyword):
@@ -183,20 +431,18 @@ class Not(Keyword):
         )
 
     def __call__(self, instance, location):
-        # errors populated but not actual error.
-        # unset error?
-        result = self._validator(instance=instance, location=location)
-        return (
-            ValidationResult(
-                message="failed Not validation",
-                location=location,
-                keywordLocation=self.location,
-                sub_results=[result],
-            )
-            if result
-            else True
+        if self.is_valid(instance=instance):
+            return True
+        # the subschema passed so there are no failures to report
+        return ValidationResult(
+            message="failed Not validation",
+            location=location,
+            keywordLocation=self.location,
         )
 
+    def is_valid(self, instance):
+        return not self._validator.is_valid(instance=instance)
+
     def sub_validators(self):
         if self._validator:
             yield self._validator
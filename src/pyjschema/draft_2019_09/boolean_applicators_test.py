@@ -1,9 +1,220 @@
 import unittest
 
-from pyjschema.draft_2019_09 import validate
+import parameterized  # type: ignore
+
+from pyjschema.draft_2019_09 import construct_validator, validate
+
+from .boolean_applicators import AllOf, AnyOf, OneOf
+from .testing import build_keyword, recorders
 
 
 class Test(unittest.TestCase):
     def test(self):
         res = validate(schema={"not": True}, instance="123")
         self.assertFalse(res)
+
+
+class TestShortCircuit(unittest.TestCase):
+    def test_any_of_stops_at_first_match(self):
+        any_of = build_keyword({"anyOf": [{"type": "string"}, {"type": "integer"}, {"minimum": 0}]}, AnyOf)
+        checked: list = []
+        any_of._validators = recorders(any_of._validators, checked)
+        self.assertTrue(any_of(instance=1, location=""))
+        self.assertEqual(checked, [(0, "is_valid", 1), (1, "is_valid", 1)])
+
+    def test_any_of_reports_every_branch_when_none_match(self):
+        res = validate(schema={"anyOf": [{"type": "string"}, {"type": "integer"}]}, instance=1.5)
+        self.assertFalse(res)
+        self.assertEqual(len(res.sub_results[0].sub_results), 2)
+
+    def test_one_of_stops_at_second_match(self):
+        one_of = build_keyword({"oneOf": [{"type": "integer"}, {"minimum": 0}, {"maximum": 10}]}, OneOf)
+        checked: list = []
+        one_of._validators = recorders(one_of._validators, checked)
+        res = one_of(instance=1, location="")
+        self.assertFalse(res)
+        self.assertEqual(res.message, "failed oneOf, the subschemas at 0 and 1 both match")
+        self.assertEqual(checked, [(0, "is_valid", 1), (1, "is_valid", 1)])
+
+    def test_one_of(self):
+        schema = {"oneOf": [{"type": "integer"}, {"type": "string"}]}
+        self.assertTrue(validate(schema=schema, instance=1))
+        res = validate(schema=schema, instance=1.5)
+        self.assertFalse(res)
+        self.assertEqual(len(res.sub_results[0].sub_results), 2)
+
+    def test_not(self):
+        res = validate(schema={"not": {"type": "integer"}}, instance=1)
+        self.assertFalse(res)
+        self.assertFalse(res.sub_results[0].sub_results)
+
+
+def tagged_union(count, keyword="oneOf"):
+    return {
+        keyword: [
+            {
+                "type": "object",
+                "properties": {"kind": {"const": f"event{index}"}, "value": {"type": "integer"}},
+                "required": ["kind"],
+            }
+            for index in range(count)
+        ]
+    }
+
+
+class TestDiscriminator(unittest.TestCase):
+    @parameterized.parameterized.expand([("oneOf", OneOf), ("anyOf", AnyOf)])
+    def test_only_the_tagged_branch_runs(self, keyword, kind):
+        union = build_keyword(tagged_union(40, keyword), kind)
+        union.is_valid({})
+        checked: list = []
+        union._validators = recorders(union._validators, checked)
+        self.assertTrue(union.is_valid({"kind": "event7", "value": 1}))
+        self.assertFalse(union.is_valid({"kind": "event7", "value": "1"}))
+        self.assertEqual(checked, [(7, "is_valid", {"kind": "event7", "value": 1}), (7, "is_valid", {"kind": "event7", "value": "1"})])
+
+    def test_only_the_tagged_branch_is_reported(self):
+        res = validate(schema=tagged_union(40), instance={"kind": "event7", "value": "1"})
+        self.assertFalse(res)
+        self.assertEqual(len(res.sub_results[0].sub_results), 1)
+
+    def test_every_branch_is_reported_for_an_unknown_tag(self):
+        res = validate(schema=tagged_union(3), instance={"kind": "other"})
+        self.assertEqual(len(res.sub_results[0].sub_results), 3)
+
+    @parameterized.parameterized.expand(
+        [
+            ("tagged", {"kind": "a", "a": 1}, True),
+            ("enum", {"kind": "c", "c": 1}, True),
+            ("untagged branch", {"kind": "z", "other": 1}, True),
+            ("wrong tag", {"kind": "a", "b": 1}, False),
+            ("missing tag is allowed by b", {"b": 1}, True),
+            ("missing tag", {"a": 1}, False),
+            ("boolean is not a number", {"kind": True, "number": 1}, False),
+            ("number", {"kind": 1.0, "number": 1}, True),
+            ("unhashable tag", {"kind": ["a"], "other": 1}, True),
+            ("not an object", "a", True),
+            ("array", [], True),
+        ]
+    )
+    def test_same_result_as_every_branch(self, _, instance, expected):
+        schema = {
+            "anyOf": [
+                {"properties": {"kind": {"const": "a"}}, "required": ["kind", "a"]},
+                {"properties": {"kind": {"enum": ["b", "c"]}}, "required": ["b"]},
+                {"properties": {"kind": {"enum": ["c"]}}, "required": ["c"]},
+                {"properties": {"kind": {"const": 1}}, "required": ["kind", "number"]},
+                {"required": ["other"]},
+                {"type": "array"},
+            ]
+        }
+        self.assertEqual(bool(validate(schema=schema, instance=instance)), expected)
+        union = build_keyword(schema, AnyOf)
+        self.assertEqual(any(branch.is_valid(instance) for branch in union._validators), expected)
+        self.assertEqual(union.is_valid(instance), expected)
+
+    def test_ref_branches(self):
+        schema = {
+            "$defs": {
+                "click": {"$ref": "#/$defs/event", "properties": {"kind": {"const": "click"}, "x": {"type": "integer"}}},
+                "key": {"allOf": [{"$ref": "#/$defs/event"}, {"properties": {"kind": {"const": "key"}}}]},
+                "event": {"type": "object", "required": ["kind"]},
+            },
+            "oneOf": [{"$ref": "#/$defs/click"}, {"$ref": "#/$defs/key"}],
+        }
+        validate_ = construct_validator(schema=schema)
+        self.assertTrue(validate_({"kind": "click", "x": 1}))
+        self.assertFalse(validate_({"kind": "click", "x": "1"}))
+        self.assertTrue(validate_({"kind": "key"}))
+        self.assertFalse(validate_({"x": 1}))
+        one_of = build_keyword(schema, OneOf)
+        one_of.is_valid({})
+        self.assertEqual(one_of._discriminator.tag, "kind")
+        self.assertEqual(one_of._candidates({"kind": "key"}), (1,))
+        self.assertEqual(one_of._candidates({}), ())
+
+    def test_type(self):
+        union = build_keyword({"oneOf": [{"type": "string"}, {"type": "integer"}, {"type": "number", "minimum": 2}]}, OneOf)
+        self.assertEqual(union._candidates("a"), (0,))
+        self.assertEqual(union._candidates(1), (1, 2))
+        self.assertEqual(union._candidates(1.5), (2,))
+        self.assertEqual(union._candidates(True), ())
+        self.assertTrue(union.is_valid(1))
+        self.assertFalse(union.is_valid(3))
+
+    def test_nothing_to_dispatch_on(self):
+        union = build_keyword({"anyOf": [{"minimum": 1}, {"maxLength": 2}]}, AnyOf)
+        self.assertEqual(union._candidates("a"), (0, 1))
+        self.assertIsNone(union._discriminator.tag)
+
+
+def if_chain(count, comment=False):
+    ifs = [{"if": {"properties": {"type": {"const": f"kind{index}"}}}, "then": {"required": [f"field{index}"]}} for index in range(count)]
+    if comment:
+        # the chain isn't recognised with anything else in the if
+        for item in ifs:
+            item["if"]["$comment"] = "no dispatch"
+    return {"allOf": ifs}
+
+
+class TestIfChain(unittest.TestCase):
+    def test_only_the_branch_that_applies_runs(self):
+        all_of = build_keyword(if_chain(30), AllOf)
+        self.assertEqual(all_of._applicable({"type": "kind4"}), ((4, all_of._validators[4]._validators["if"]._then_validator),))
+        self.assertEqual(all_of._applicable({"type": "other"}), ())
+        self.assertEqual(all_of._applicable({}), tuple(enumerate(branch._validators["if"]._then_validator for branch in all_of._validators)))
+        self.assertEqual(len(all_of._applicable([])), 30)
+        self.assertTrue(all_of.is_valid({"type": "kind4", "field4": 1}))
+        self.assertFalse(all_of.is_valid({"type": "kind4", "field5": 1}))
+
+    @parameterized.parameterized.expand(
+        [
+            ("then", {"type": "a", "a": 1}),
+            ("then fails", {"type": "a", "b": 1}),
+            ("enum", {"type": "c", "b": 1}),
+            ("else", {"type": "z", "else": 1}),
+            ("else fails", {"type": "z"}),
+            ("required if", {"b": 1, "else": 1}),
+            ("missing tag", {"a": 1, "b": 1}),
+            ("other subschema", {"type": "a", "a": 1, "d": "1"}),
+            ("boolean", {"type": True, "a": 1}),
+            ("not an object", "a"),
+        ]
+    )
+    def test_same_result_as_every_if(self, _, instance):
+        chain = [
+            {"if": {"properties": {"type": {"const": "a"}}}, "then": {"required": ["a"]}},
+            {"if": {"properties": {"type": {"enum": ["b", "c"]}}, "required": ["type"]}, "then": {"required": ["b"]}, "else": {"required": ["else"]}},
+            {"if": {"properties": {"other": {"const": "a"}}}, "then": {"required": ["other"]}},
+            {"properties": {"d": {"type": "integer"}}},
+        ]
+        undispatched = [dict(item, **{"if": dict(item["if"], **{"$comment": "no dispatch"})}) if "if" in item else item for item in chain]
+        self.assertEqual(validate(schema={"allOf": chain}, instance=instance), validate(schema={"allOf": undispatched}, instance=instance))
+        all_of = build_keyword({"allOf": chain}, AllOf)
+        all_of.is_valid(instance)
+        self.assertEqual(all_of._chain.tag, "type")
+
+    def test_same_results_as_every_if(self):
+        instance = {"type": "kind3"}
+        self.assertEqual(validate(schema=if_chain(5), instance=instance), validate(schema=if_chain(5, comment=True), instance=instance))
+        all_of = build_keyword(if_chain(5, comment=True), AllOf)
+        all_of.is_valid(instance)
+        self.assertIsNone(all_of._chain.tag)
+
+    @parameterized.parameterized.expand(
+        [
+            ("true", True, 1, False),
+            ("true passes", True, "a", True),
+            ("false", False, 1, True),
+        ]
+    )
+    def test_boolean_if(self, _, if_, instance, expected):
+        schema = {
+            "allOf": [
+                {"if": if_, "then": {"type": "string"}},
+                {"if": {"properties": {"type": {"const": "a"}}}, "then": {"required": ["a"]}},
+                {"if": {"properties": {"type": {"const": "b"}}}, "then": {"required": ["b"]}},
+            ]
+        }
+        self.assertEqual(bool(validate(schema=schema, instance=instance)), expected)
+        self.assertEqual(bool(construct_validator(schema=schema)(instance)), expected)
@@ -0,0 +1,588 @@
+"""
+Compiles a validator tree into specialized python functions.
+
+The tree built by build_validator_and_resolve_references is walked once and every subschema becomes
+a plain python function with the checks for its keywords inlined - so at validation time there are no
+Keyword objects, decorators or dictionaries to go through.
+Two functions are generated for every subschema - one that returns True or the first ValidationResult it
+finds and one that only returns True or False. The second is used wherever the details of a failure are thrown
+away anyway e.g the branches of anyOf, oneOf, not, if and contains.
+"""
+import numbers
+import typing
+
+from pyjschema.patterns import Contains, Everything, Exact, PatternSet, Prefix, Suffix
+from pyjschema.common import AValidator
+from pyjschema.utils import ValidationResult, escape_json_pointer
+
+from .boolean_applicators import AllOf, AnyOf, IfElseThen, Not, OneOf
+from .defs import Defs
+from .ref import RecursiveRef, Ref
+from .types import AcceptAll, Const, Enum, RejectAll
+from .types.array import (
+    _Array,
+    _Contains,
+    _Items,
+    _MaxItems,
+    _MinItems,
+    _UniqueItems,
+    are_unique,
+    first_duplicate,
+)
+from .types.number import MESSAGES, _Number, is_multiple_of_ratio
+from .types.object_ import (
+    _DependentRequired,
+    _MaxProperties,
+    _MinProperties,
+    _Object,
+    _Property,
+    _PropertyNames,
+    _Required,
+)
+from .types.primitives import canonical
+from .types.string import _MaxLength, _MinLength, _Pattern, _String
+from .types.type_ import Type
+from .validator import Validator
+
+__all__ = ["compile_validator"]
+
+# guards are checked in this order, numbers come last since checking against the numbers.Number ABC is the slowest
+GUARDS = {
+    "str": "isinstance(instance, str)",
+    "dict": "isinstance(instance, dict)",
+    "list": "isinstance(instance, list)",
+    "number": "isinstance(instance, _NUMBER)",
+}
+
+TYPE_CONDITIONS = {
+    "string": "isinstance(instance, str)",
+    "boolean": "isinstance(instance, bool)",
+    "integer": "(isinstance(instance, int) and not isinstance(instance, bool))",
+    "number": "(isinstance(instance, _NUMBER) and not isinstance(instance, bool))",
+    "array": "isinstance(instance, list)",
+    "object": "isinstance(instance, dict)",
+    "null": "instance is None",
+}
+
+
+def compile_validator(validator: AValidator):
+    """
+    returns a (validate, is_valid) pair of functions generated from this validator
+    """
+    generator = _CodeGenerator()
+    validate = generator.function_for(validator, detailed=True)
+    is_valid = generator.function_for(validator, detailed=False)
+    namespace = generator.build()
+    return namespace[validate], namespace[is_valid]
+
+
+def _relocate(result, key):
+    # failures are located relative to the function that found them and prefixed on the way back up,
+    # that way nothing is spent on locations for instances that are valid
+    result.location = f"/{escape_json_pointer(key)}{result.location}"
+    return result
+
+
+def _indent(lines, level=1):
+    return ["    " * level + line for line in lines]
+
+
+class _CodeGenerator:
+    def __init__(self):
+        self.namespace: typing.Dict[str, typing.Any] = {
+            "ValidationResult": ValidationResult,
+            "_NUMBER": (int, float, numbers.Number),
+            "_relocate": _relocate,
+            "canonical": canonical,
+            "are_unique": are_unique,
+            "first_duplicate": first_duplicate,
+            "is_multiple_of_ratio": is_multiple_of_ratio,
+        }
+        self._names: typing.Dict[typing.Tuple[int, bool], str] = {}
+        self._pending: typing.List[typing.Tuple[AValidator, bool, str]] = []
+        self._tables: typing.List[str] = []
+        self._sources: typing.List[str] = []
+        self._detailed = True
+
+    def function_for(self, validator: AValidator, detailed: bool) -> str:
+        key = (id(validator), detailed)
+        if key not in self._names:
+            name = f"{'validate' if detailed else 'is_valid'}_{len(self._names)}"
+            self._names[key] = name
+            # the validator is kept alive in the namespace so that its id can't be reused by another validator
+            self.namespace[f"_node_{name}"] = validator
+            self._pending.append((validator, detailed, name))
+        return self._names[key]
+
+    def constant(self, value, prefix="const") -> str:
+        name = f"_{prefix}_{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def function_table(self, validators: typing.Dict[str, AValidator]) -> str:
+        "a dictionary of key to the generated function for each validator"
+        name = self.constant(
+            {key: self.function_for(validator, self._detailed) for key, validator in validators.items()},
+            prefix="table",
+        )
+        self._tables.append(name)
+        return name
+
+    def build(self):
+        while self._pending:
+            validator, detailed, name = self._pending.pop()
+            self._detailed = detailed
+            body = self._generate_body(validator)
+            self._sources.append(
+                "\n".join([f"def {name}(instance):"] + _indent(body + ["return True"]))
+            )
+        source = "\n\n".join(self._sources)
+        exec(compile(source, "<pyjschema-codegen>", "exec"), self.namespace)
+        # the functions only exist once the source is executed so the tables are filled in afterwards
+        for table in self._tables:
+            self.namespace[table] = {
+                key: self.namespace[name] for key, name in self.namespace[table].items()
+            }
+        return self.namespace
+
+    def fail(self, message: str, keyword_location: str, arguments: typing.Optional[typing.Dict[str, str]] = None) -> str:
+        """
+        message is the source of an expression e.g an f-string. With arguments - the sources of their values - it is
+        a str.format template that ValidationResult fills in only if the message is read
+        """
+        if not self._detailed:
+            return "return False"
+        lazy = ""
+        if arguments is not None:
+            lazy = ", arguments={" + ", ".join(f"{name!r}: {value}" for name, value in arguments.items()) + "}"
+        return f"return ValidationResult(message={message}, keywordLocation={keyword_location!r}, location=''{lazy})"
+
+    def check(self, validator: AValidator, instance: str = "instance", key: typing.Optional[str] = None) -> typing.List[str]:
+        "lines that validate `instance` against a sub validator and return early if it fails"
+        if isinstance(validator, AcceptAll):
+            return []
+        return self.check_call(self.function_for(validator, detailed=self._detailed), instance, key)
+
+    def check_call(self, function: str, instance: str = "instance", key: typing.Optional[str] = None) -> typing.List[str]:
+        if not self._detailed:
+            return [f"if not {function}({instance}):", "    return False"]
+        result = "result" if key is None else f"_relocate(result, {key})"
+        return [
+            f"result = {function}({instance})",
+            "if result is not True:",
+            f"    return {result}",
+        ]
+
+    def condition(self, validator: AValidator, instance: str = "instance") -> str:
+        "an expression that is truthy when `instance` is valid against a sub validator"
+        if isinstance(validator, AcceptAll):
+            return "True"
+        return f"{self.function_for(validator, detailed=False)}({instance})"
+
+    def _generate_body(self, validator: AValidator) -> typing.List[str]:
+        keywords = (
+            list(validator._validators.values())
+            if isinstance(validator, Validator)
+            else [validator]
+        )
+        unguarded: typing.List[str] = []
+        guarded: typing.Dict[str, typing.List[str]] = {guard: [] for guard in GUARDS}
+        for keyword in keywords:
+            guard, generate = GENERATORS.get(type(keyword), (None, _generate_fallback))
+            lines = generate(self, keyword)
+            (guarded[guard] if guard else unguarded).extend(lines)
+
+        body = unguarded
+        statement = "if"
+        for guard, condition in GUARDS.items():
+            if guarded[guard]:
+                body += [f"{statement} {condition}:"] + _indent(guarded[guard])
+                statement = "elif"
+        return body
+
+
+def _generate_fallback(generator: _CodeGenerator, validator: AValidator):
+    # validators without a generator are called as they are
+    node = generator.constant(validator, prefix="node")
+    if not generator._detailed:
+        return [f"if not {node}.is_valid(instance=instance):", "    return False"]
+    return [
+        f"result = {node}(instance=instance, location='')",
+        "if not result:",
+        "    return result",
+    ]
+
+
+def _generate_nothing(generator, validator):
+    return []
+
+
+def _generate_reject_all(generator, validator: RejectAll):
+    return [generator.fail("'this fails for every instance'", validator.location)]
+
+
+def _generate_type(generator, validator: Type):
+    condition = " or ".join(TYPE_CONDITIONS[type_] for type_ in validator._types)
+    value = generator.constant(validator.value)
+    return [
+        f"if not ({condition}):",
+        "    " + generator.fail(repr(validator.message), validator.location, {"instance": "instance", "value": value}),
+    ]
+
+
+def _generate_const(generator, validator: Const):
+    value = generator.constant(validator.value)
+    canonical_value = generator.constant(validator._canonical)
+    if isinstance(validator.value, (dict, list)):
+        condition = f"not (isinstance(instance, {type(validator.value).__name__}) and canonical(instance) == {canonical_value})"
+    else:
+        condition = f"isinstance(instance, (dict, list)) or canonical(instance) != {canonical_value}"
+    return [
+        f"if {condition}:",
+        "    " + generator.fail(repr(validator.message), validator.location, {"instance": "instance", "value": value}),
+    ]
+
+
+def _generate_enum(generator, validator: Enum):
+    values = generator.constant(validator.value)
+    canonical_values = generator.constant(validator._canonical)
+    return [
+        f"if canonical(instance) not in {canonical_values}:",
+        "    " + generator.fail(repr(validator.message), validator.location, {"instance": "instance", "value": values}),
+    ]
+
+
+def _comparison(template):
+    def generate(generator, validator):
+        value = generator.constant(validator.value)
+        return [
+            f"if not ({template.format(value=value)}):",
+            "    " + generator.fail(repr(validator.message), validator.location, {"instance": "instance", "value": value}),
+        ]
+
+    return generate
+
+
+BOUND_OPERATORS = {"minimum": ">=", "exclusiveMinimum": ">", "maximum": "<=", "exclusiveMaximum": "<"}
+
+
+def _generate_number(generator, validator: _Number):
+    lines = []
+    if generator._detailed:
+        # every bound in the order the interpreted validator reports them so that the first failure is the same
+        bounds = [(keyword, bound) for keyword, bound, _ in validator._bounds]
+    else:
+        bounds = [
+            (keyword, bound)
+            for bound, keyword in [(validator.lower, validator.lower_keyword), (validator.upper, validator.upper_keyword)]
+            if bound is not None
+        ]
+    for keyword, bound in bounds:
+        value = generator.constant(bound)
+        lines += [
+            f"if not (instance {BOUND_OPERATORS[keyword]} {value}):",
+            "    " + generator.fail(
+                repr(MESSAGES[keyword]), f"{validator.location}/{keyword}", {"instance": "instance", "value": value}
+            ),
+        ]
+    if validator._multiple_of_ratio is not None:
+        value = generator.constant(validator.multipleOf)
+        numerator, denominator = validator._multiple_of_ratio
+        condition = f"is_multiple_of_ratio(instance, {numerator}, {denominator})"
+        if denominator == 1:
+            condition = f"(instance % {numerator} == 0 if type(instance) is int else {condition})"
+        lines += [
+            f"if not {condition}:",
+            "    " + generator.fail(
+                repr(MESSAGES["multipleOf"]), f"{validator.location}/multipleOf", {"instance": "instance", "value": value}
+            ),
+        ]
+    return lines
+
+
+def _search(generator, regex, string: str) -> str:
+    "an expression for regex.search(string), the simple patterns are matched with string methods inline"
+    if isinstance(regex, Everything):
+        return "True"
+    if isinstance(regex, Contains):
+        return f"{generator.constant(regex.literal)} in {string}"
+    if isinstance(regex, Prefix):
+        return f"{string}.startswith({generator.constant(regex.literal)})"
+    if isinstance(regex, Suffix):
+        return f"{string}.endswith({generator.constant(regex.literals)})"
+    if isinstance(regex, Exact):
+        return f"{string} in {generator.constant(regex.literals)}"
+    return f"{generator.constant(regex, prefix='regex')}.search({string})"
+
+
+def _generate_pattern(generator, validator: _Pattern):
+    regex = generator.constant(validator.regex, prefix="regex")
+    return [
+        f"if not ({_search(generator, validator.regex, 'instance')}):",
+        "    " + generator.fail(repr(validator.message), validator.location, {"instance": "instance", "value": f"{regex}.pattern"}),
+    ]
+
+
+def _generate_array(generator, validator: _Array):
+    # ARRAY_KEYWORDS puts the length checks first
+    lines = []
+    for keyword in validator._keywords:
+        lines += GENERATORS[type(keyword)][1](generator, keyword)
+    return lines
+
+
+def _generate_string(generator, validator: _String):
+    if generator._detailed or validator._allowed is None:
+        checks = []
+        for keyword in validator._keywords:
+            if keyword is not validator._type:
+                checks += GENERATORS[type(keyword)][1](generator, keyword)
+    else:
+        # the strings that pass every keyword were worked out when the schema was built
+        allowed = generator.constant(validator._allowed, prefix="allowed")
+        checks = [f"if instance not in {allowed}:", "    return False"]
+    if validator._type is None:
+        return (["if isinstance(instance, str):"] + _indent(checks)) if checks else []
+    # only strings get past the type check
+    return _generate_type(generator, validator._type) + checks
+
+
+def _generate_unique_items(generator, validator: _UniqueItems):
+    if not validator.value:
+        return []
+    return [
+        "if not are_unique(instance):",
+        "    " + generator.fail(
+            "'This doesnt have unique items, the items at {} and {} are equal'.format(*first_duplicate(instance))",
+            validator.location,
+        ),
+    ]
+
+
+def _generate_items(generator, validator: _Items):
+    lines = []
+    if validator._items_validator:
+        body = generator.check(validator._items_validator, instance="item", key="i")
+        if body:
+            lines += ["for i, item in enumerate(instance):"] + _indent(body)
+        return lines
+    for i, items_validator in enumerate(validator._items_validators):
+        body = generator.check(items_validator, instance=f"instance[{i}]", key=i)
+        if body:
+            lines += [f"if len(instance) > {i}:"] + _indent(body)
+    if validator._additional_items_validator:
+        body = generator.check(validator._additional_items_validator, instance="instance[i]", key="i")
+        if body:
+            lines += [f"for i in range({len(validator._items_validators)}, len(instance)):"] + _indent(body)
+    return lines
+
+
+def _generate_contains(generator, validator: _Contains):
+    if not validator._validator:
+        return []
+    lines = [
+        "count = 0",
+        "for item in instance:",
+        f"    if {generator.condition(validator._validator, instance='item')}:",
+        "        count += 1",
+        f"        if count >= {validator._enough!r}:",
+        "            break",
+        "if count == 0:",
+        "    " + generator.fail("'This doesnt contain an item that matches this'", f"{validator.location}/contains"),
+    ]
+    if validator.minContainsValue != -float("inf"):
+        lines += [
+            f"if count < {validator.minContainsValue!r}:",
+            "    " + generator.fail(f"'This contains less than {validator.minContainsValue} matches'", f"{validator.location}/minContains"),
+        ]
+    if validator.maxContainsValue != float("inf"):
+        lines += [
+            f"if count > {validator.maxContainsValue!r}:",
+            "    " + generator.fail(f"'This contains more than {validator.maxContainsValue} matches'", f"{validator.location}/maxContains"),
+        ]
+    return lines
+
+
+def _generate_property(generator, validator: _Property):
+    properties = {
+        key: sub_validator
+        for key, sub_validator in validator._validators.items()
+        if not isinstance(sub_validator, AcceptAll)
+    }
+    patterns = list(validator._pattern_validators.items())
+    additional = validator._additional_validator
+
+    if not patterns and additional is None:
+        # only the properties in the schema are validated so iterate over those instead of the instance
+        lines = []
+        for key, sub_validator in properties.items():
+            lines += [f"if {key!r} in instance:"] + _indent(
+                generator.check(sub_validator, instance=f"instance[{key!r}]", key=repr(key))
+            )
+        return lines
+
+    lines = ["for key, value in instance.items():"]
+    body = []
+    if validator._validators:
+        known = generator.constant(frozenset(validator._validators), prefix="keys")
+        body += [f"matched = key in {known}"]
+        if properties:
+            table = generator.function_table(properties)
+            body += [f"function = {table}.get(key)", "if function is not None:"] + _indent(
+                generator.check_call("function", instance="value", key="key")
+            )
+    else:
+        body += ["matched = False"]
+    pattern_checks = []
+    for regex, sub_validator in patterns:
+        pattern_checks += [f"if {_search(generator, regex, 'key')}:", "    matched = True"] + _indent(
+            generator.check(sub_validator, instance="value", key="key")
+        )
+    prefilter = PatternSet(regex for regex, _ in patterns).prefilter
+    if prefilter is not None:
+        # one search rules out every pattern for most keys
+        pattern_checks = [f"if {generator.constant(prefilter, prefix='prefilter')}(key):"] + _indent(pattern_checks)
+    body += pattern_checks
+    if additional is not None:
+        check = generator.check(additional, instance="value", key="key")
+        if check:
+            body += ["if not matched:"] + _indent(check)
+    lines += _indent(body)
+    return lines
+
+
+def _generate_object(generator, validator: _Object):
+    # the checks are cheap once inlined so the generated code doesn't need the shape cache
+    lines = []
+    for keyword in validator._keywords:
+        lines += GENERATORS[type(keyword)][1](generator, keyword)
+    return lines
+
+
+def _generate_required(generator, validator: _Required):
+    return _missing_keys(generator, generator.constant(validator._required), validator.message, validator.location)
+
+
+def _missing_keys(generator, keys: str, message: str, keyword_location: str, arguments: typing.Optional[typing.Dict[str, str]] = None):
+    "fails with the keys that are missing, is_valid stops at the first one"
+    if not generator._detailed:
+        return [f"for key in {keys}:", "    if key not in instance:", "        return False"]
+    return [
+        f"missing = [key for key in {keys} if key not in instance]",
+        "if missing:",
+        "    " + generator.fail(repr(message), keyword_location, arguments={**(arguments or {}), "missing": "missing"}),
+    ]
+
+
+def _generate_property_names(generator, validator: _PropertyNames):
+    check = generator.check(validator._validator, instance="key", key="key")
+    return (["for key in instance:"] + _indent(check)) if check else []
+
+
+def _generate_dependent_required(generator, validator: _DependentRequired):
+    lines = []
+    for prop, dependencies in validator.value.items():
+        missing = _missing_keys(
+            generator,
+            generator.constant(tuple(dependencies)),
+            validator.message,
+            f"{validator.location}/{prop}",
+            arguments={"prop": repr(prop)},
+        )
+        lines += [f"if {prop!r} in instance:"] + _indent(missing)
+    return lines
+
+
+def _generate_all_of(generator, validator: AllOf):
+    lines = []
+    for sub_validator in validator._validators:
+        lines += generator.check(sub_validator)
+    return lines
+
+
+def _generate_any_of(generator, validator: AnyOf):
+    condition = " or ".join(generator.condition(sub_validator) for sub_validator in validator._validators)
+    return [
+        f"if not ({condition}):",
+        "    " + generator.fail("'failed AnyOf'", validator.location),
+    ]
+
+
+def _generate_one_of(generator, validator: OneOf):
+    lines = ["count = 0"]
+    for sub_validator in validator._validators:
+        lines += [
+            f"if {generator.condition(sub_validator)}:",
+            "    count += 1",
+            "    if count > 1:",
+            "        " + generator.fail("'failed oneOf'", validator.location),
+        ]
+    lines += ["if count == 0:", "    " + generator.fail("'failed oneOf'", validator.location)]
+    return lines
+
+
+def _generate_not(generator, validator: Not):
+    return [
+        f"if {generator.condition(validator._validator)}:",
+        "    " + generator.fail("'failed Not validation'", validator.location),
+    ]
+
+
+def _generate_if_else_then(generator, validator: IfElseThen):
+    if not validator._if_validator:
+        return []
+    then_ = generator.check(validator._then_validator) if validator._then_validator else []
+    else_ = generator.check(validator._else_validator) if validator._else_validator else []
+    if not (then_ or else_):
+        return []
+    return (
+        [f"if {generator.condition(validator._if_validator)}:"]
+        + _indent(then_ or ["pass"])
+        + ["else:"]
+        + _indent(else_ or ["pass"])
+    )
+
+
+def _generate_ref(generator, validator: typing.Union[Ref, RecursiveRef]):
+    return generator.check(validator._validator)
+
+
+def _generate_subschema(generator, validator: Validator):
+    # a $ref that was inlined, see inline_references
+    return generator.check(validator)
+
+
+GENERATORS: typing.Dict[type, typing.Tuple[typing.Optional[str], typing.Callable]] = {
+    AcceptAll: (None, _generate_nothing),
+    RejectAll: (None, _generate_reject_all),
+    Defs: (None, _generate_nothing),
+    Ref: (None, _generate_ref),
+    RecursiveRef: (None, _generate_ref),
+    Validator: (None, _generate_subschema),
+    Type: (None, _generate_type),
+    Const: (None, _generate_const),
+    Enum: (None, _generate_enum),
+    _Number: ("number", _generate_number),
+    _MaxLength: ("str", _comparison("len(instance) <= {value}")),
+    _MinLength: ("str", _comparison("{value} <= len(instance)")),
+    _Pattern: ("str", _generate_pattern),
+    _String: (None, _generate_string),
+    _MaxItems: ("list", _comparison("len(instance) <= {value}")),
+    _MinItems: ("list", _comparison("{value} <= len(instance)")),
+    _UniqueItems: ("list", _generate_unique_items),
+    _Items: ("list", _generate_items),
+    _Contains: ("list", _generate_contains),
+    _Array: ("list", _generate_array),
+    _Required: ("dict", _generate_required),
+    _DependentRequired: ("dict", _generate_dependent_required),
+    _MaxProperties: ("dict", _comparison("len(instance) <= {value}")),
+    _MinProperties: ("dict", _comparison("{value} <= len(instance)")),
+    _PropertyNames: ("dict", _generate_property_names),
+    _Property: ("dict", _generate_property),
+    _Object: ("dict", _generate_object),
+    AllOf: (None, _generate_all_of),
+    AnyOf: (None, _generate_any_of),
+    OneOf: (None, _generate_one_of),
+    Not: (None, _generate_not),
+    IfElseThen: (None, _generate_if_else_then),
+}
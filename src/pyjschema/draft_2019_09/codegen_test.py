@@ -0,0 +1,91 @@
+import unittest
+
+import parameterized  # type: ignore
+
+from .validator_construction import construct_validator
+
+
+class TestCodegen(unittest.TestCase):
+    def setUp(self):
+        self.schema = {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "maxLength": 5},
+                "tags": {"type": "array", "items": {"$ref": "#/$defs/tag"}},
+            },
+            "$defs": {"tag": {"type": "string", "pattern": "^[a-z]+$"}},
+        }
+
+    def test_valid(self):
+        validate = construct_validator(self.schema, mode="codegen")
+        self.assertIs(validate({"name": "abc", "tags": ["a", "b"]}), True)
+
+    def test_first_failure_is_returned(self):
+        validate = construct_validator(self.schema, mode="codegen")
+        result = validate({"name": "abc", "tags": ["a", "B"]})
+        self.assertFalse(result)
+        self.assertEqual(result.location, "/tags/1")
+        self.assertEqual(result.keywordLocation, "/$defs/tag/pattern")
+
+    def test_same_location_as_interpreted(self):
+        schema = {"additionalProperties": {"items": {"type": "string"}}}
+        instance = {"a/b": ["x"], "c~d": ["y", 1]}
+        interpreted = construct_validator(schema)(instance)
+        while interpreted.sub_results:
+            interpreted = interpreted.sub_results[0]
+        self.assertEqual(interpreted.location, "/c~0d/1")
+        self.assertEqual(construct_validator(schema, mode="codegen")(instance).location, "/c~0d/1")
+
+    def test_same_message_as_interpreted(self):
+        for schema, instance in [
+            ({"type": "string"}, 1),
+            ({"maxProperties": 1}, {"a": 1, "b": 2}),
+            ({"minimum": 2}, 1),
+            ({"enum": ["a"]}, "b"),
+        ]:
+            with self.subTest(schema=schema):
+                self.assertEqual(
+                    construct_validator(schema, mode="codegen")(instance).message,
+                    construct_validator(schema)(instance).sub_results[0].message,
+                )
+
+    @parameterized.parameterized.expand(
+        [
+            ("type", {"type": "string"}, 1),
+            ("const", {"const": "a"}, "b"),
+            ("enum", {"enum": ["a"]}, "b"),
+            ("minimum", {"minimum": 2}, 1),
+            ("exclusiveMaximum", {"exclusiveMaximum": 2}, 2),
+            ("two lower bounds", {"minimum": 1, "exclusiveMinimum": 1}, 0),
+            ("looser bound first", {"maximum": 5, "exclusiveMaximum": 3}, 4),
+            ("multipleOf", {"multipleOf": 2}, 3),
+            ("minLength", {"minLength": 2}, "a"),
+            ("maxLength", {"maxLength": 1}, "ab"),
+            ("pattern", {"pattern": "^a"}, "b"),
+            ("minItems", {"minItems": 2}, [1]),
+            ("maxItems", {"maxItems": 1}, [1, 2]),
+            ("maxProperties", {"maxProperties": 1}, {"a": 1, "b": 2}),
+            ("minProperties", {"minProperties": 2}, {"a": 1}),
+            ("required", {"required": ["a", "b", "c"]}, {"b": 1}),
+            ("dependentRequired", {"dependentRequired": {"a": ["b", "c"], "d": ["e"]}}, {"a": 1, "c": 1}),
+            ("nested", {"properties": {"a": {"required": ["b"]}}}, {"a": {}}),
+        ]
+    )
+    def test_same_result_as_interpreted(self, _, schema, instance):
+        interpreted = construct_validator(schema)(instance)
+        while interpreted.sub_results:
+            interpreted = interpreted.sub_results[0]
+        self.assertEqual(construct_validator(schema, mode="codegen")(instance), interpreted)
+
+    def test_recursive_schema(self):
+        schema = {
+            "type": "object",
+            "properties": {"children": {"type": "array", "items": {"$ref": "#"}}},
+        }
+        validate = construct_validator(schema, mode="codegen")
+        self.assertTrue(validate({"children": [{"children": []}]}))
+        self.assertFalse(validate({"children": [{"children": [1]}]}))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            construct_validator(True, mode="unknown")
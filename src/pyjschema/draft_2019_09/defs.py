@@ -20,6 +20,9 @@ class Defs(Keyword):
     def __call__(self, instance, location):
         return True
 
+    def is_valid(self, instance):
+        return True
+
     def sub_validators(self):
         yield from self._validators.values()
 
@@ -0,0 +1,431 @@
+"""
+An optional pass that simplifies the validator tree before references are resolved.
+
+Every rewrite keeps the meaning of the schema - it only removes work that can be decided when the
+schema is built e.g an allOf with a single subschema or a `not` of a schema that accepts everything.
+Validators that a reference points to (and everything above them) are never removed or replaced so that
+references still resolve afterwards.
+"""
+import typing
+
+from pyjschema.common import AValidator
+
+from .boolean_applicators import AllOf, AnyOf, IfElseThen, Not, OneOf
+from .defs import Defs
+from .ref import RecursiveRef, Ref, lookup_validator
+from .referencing import _populate_uri_to_validator
+from .types import AcceptAll, Const, Enum, RejectAll
+from .types.array import _Array, _Contains, _Items
+from .types.object_ import _Object, _Property, _PropertyNames
+from .types.type_ import Type
+from .validator import Validator
+
+__all__ = ["optimize"]
+
+
+def optimize(validator: AValidator) -> typing.Tuple[AValidator, typing.List[str]]:
+    """
+    returns the optimized validator and a description of every rewrite that was made
+    """
+    optimizer = _Optimizer(root=validator)
+    optimizer.remove_unreachable_defs()
+    return optimizer.simplify(validator), optimizer.report
+
+
+class _Optimizer:
+    def __init__(self, root: AValidator):
+        self.root = root
+        self.report: typing.List[str] = []
+        self._simplified: typing.Dict[int, AValidator] = {}
+        self._targets, self._unresolved = _reference_targets(root)
+        self._pinned = _pinned(root, self._targets, self._unresolved)
+
+    def replaceable(self, validator: AValidator) -> bool:
+        return id(validator) not in self._pinned
+
+    def simplify(self, validator: AValidator) -> AValidator:
+        if id(validator) not in self._simplified:
+            simplify = SIMPLIFIERS.get(type(validator))
+            self._simplified[id(validator)] = validator
+            if simplify:
+                self._simplified[id(validator)] = simplify(self, validator)
+        return self._simplified[id(validator)]
+
+    def droppable(self, validator: typing.Optional[AValidator], cls) -> bool:
+        return isinstance(validator, cls) and self.replaceable(validator)
+
+    def replace(self, validator: AValidator, replacement: AValidator, reason: str) -> AValidator:
+        if not self.replaceable(validator):
+            return validator
+        self.report.append(f"{validator.location or '#'}: {reason}")
+        return replacement
+
+    def remove_unreachable_defs(self):
+        if self._unresolved:
+            # a reference points somewhere outside this schema so it isn't safe to say what is unreachable
+            return
+        reachable = _reachable(self.root, self._targets)
+        for defs in _walk(self.root):
+            if not isinstance(defs, Defs):
+                continue
+            for key, validator in list(defs._validators.items()):
+                if not any(id(node) in reachable for node in _walk(validator)):
+                    del defs._validators[key]
+                    self.report.append(f"{validator.location}: removed unreachable $defs entry")
+
+
+def _walk(validator: AValidator, seen=None) -> typing.Iterator[AValidator]:
+    seen = set() if seen is None else seen
+    stack = [validator]
+    while stack:
+        validator = stack.pop()
+        if id(validator) in seen:
+            continue
+        seen.add(id(validator))
+        yield validator
+        stack.extend(validator.sub_validators())
+
+
+def _reference_targets(root: AValidator):
+    "returns what each $ref will resolve to and the ones that couldn't be found in this schema"
+    uri_to_validator = {"": root, "#": root, root.id: root}
+    _populate_uri_to_validator(
+        validator=root, root_base_uri=root.base_uri, uri_to_validator=uri_to_validator
+    )
+    targets = {}
+    unresolved: typing.Set[int] = set()
+    for validator in _walk(root):
+        if isinstance(validator, Ref):
+            target = lookup_validator(validator._get_abs_uri(), uri_to_validator)
+            if target is None:
+                unresolved.add(id(validator))
+            else:
+                targets[id(validator)] = target
+    return targets, unresolved
+
+
+def _pinned(root: AValidator, targets, unresolved: typing.Set[int]) -> typing.Set[int]:
+    """
+    Validators that can't be removed or replaced - those a reference could resolve to, those that
+    change how references resolve ($id, $anchor and $recursiveAnchor) and every validator above them.
+    References that point outside this schema are kept too so that they are still resolved - and the
+    schema is still rejected when they can't be, the same as without the optimizer.
+    """
+    pinned: typing.Set[int] = set()
+    target_ids = {id(target) for target in targets.values()}
+
+    def visit(validator, seen):
+        if id(validator) in seen:
+            return id(validator) in pinned
+        seen.add(id(validator))
+        is_pinned = (
+            id(validator) in target_ids
+            or id(validator) in unresolved
+            or validator.id is not None
+            or validator.anchor is not None
+            or getattr(validator, "recursiveAnchor", False)
+            # $recursiveRef is resolved by walking up through the parents so they have to stay where they are
+            or isinstance(validator, RecursiveRef)
+        )
+        for sub_validator in list(validator.sub_validators()):
+            is_pinned = visit(sub_validator, seen) or is_pinned
+        if is_pinned:
+            pinned.add(id(validator))
+        return is_pinned
+
+    visit(root, set())
+    pinned.add(id(root))
+    return pinned
+
+
+def _reachable(root: AValidator, targets) -> typing.Set[int]:
+    "validators reachable from the root without going through $defs, following references"
+    reachable: typing.Set[int] = set()
+    stack = [root]
+    while stack:
+        validator = stack.pop()
+        if id(validator) in reachable:
+            continue
+        reachable.add(id(validator))
+        if isinstance(validator, Defs):
+            continue
+        if id(validator) in targets:
+            stack.append(targets[id(validator)])
+        stack.extend(validator.sub_validators())
+    return reachable
+
+
+def _simplify_validator(optimizer: _Optimizer, validator: Validator) -> AValidator:
+    for key, keyword in list(validator._validators.items()):
+        keyword = optimizer.simplify(keyword)
+        if optimizer.droppable(keyword, AcceptAll):
+            del validator._validators[key]
+            optimizer.report.append(f"{validator.location or '#'}: dropped {key} since it accepts everything")
+        else:
+            validator._validators[key] = keyword
+
+    _intersect_all_of_types(optimizer, validator)
+
+    if any(isinstance(keyword, RejectAll) for keyword in validator._validators.values()):
+        return optimizer.replace(
+            validator,
+            RejectAll(schema=False, location=validator.location, parent=validator.parent),
+            "replaced with false since one of its keywords rejects everything",
+        )
+    if not validator._validators:
+        return optimizer.replace(
+            validator,
+            AcceptAll(schema=True, location=validator.location, parent=validator.parent),
+            "replaced with true since it has no keywords left",
+        )
+    return validator
+
+
+def _intersect_all_of_types(optimizer: _Optimizer, validator: Validator):
+    all_of = validator._validators.get("allOf")
+    branches = all_of._validators if isinstance(all_of, AllOf) else [all_of]
+    types = []
+    for branch in branches:
+        branch_type = branch._validators.get("type") if isinstance(branch, Validator) else None
+        if isinstance(branch_type, Type):
+            types.append(branch_type._types)
+    if not types:
+        return
+    type_ = validator._validators.get("type")
+    intersection = type_._types if isinstance(type_, Type) else list(NAMES_OF_TYPES)
+    for branch_types in types:
+        intersection = _intersect_types(intersection, branch_types)
+    if isinstance(type_, Type) and set(intersection) == set(type_._types):
+        return
+    if not isinstance(type_, Type):
+        type_ = Type(schema={"type": intersection}, location=validator.location, parent=validator)
+        validator._validators["type"] = type_
+    type_._types = intersection
+    type_.value = intersection
+    optimizer.report.append(f"{type_.location}: intersected the types across allOf to {intersection}")
+    if not intersection:
+        validator._validators["type"] = RejectAll(schema=False, location=type_.location, parent=validator)
+
+
+NAMES_OF_TYPES = ["string", "boolean", "integer", "number", "array", "object", "null"]
+
+
+def _intersect_types(types, other_types) -> typing.List[str]:
+    intersection = []
+    for type_ in NAMES_OF_TYPES:
+        in_types = type_ in types or (type_ == "integer" and "number" in types)
+        in_other_types = type_ in other_types or (type_ == "integer" and "number" in other_types)
+        if in_types and in_other_types:
+            intersection.append(type_)
+    if "number" in intersection and "integer" in intersection:
+        intersection.remove("integer")
+    return intersection
+
+
+def _simplify_all_of(optimizer: _Optimizer, validator: AllOf) -> AValidator:
+    branches = [optimizer.simplify(branch) for branch in validator._validators]
+    if any(isinstance(branch, RejectAll) for branch in branches):
+        return optimizer.replace(
+            validator,
+            RejectAll(schema=False, location=validator.location, parent=validator.parent),
+            "allOf with a subschema that rejects everything replaced with false",
+        )
+    kept = [branch for branch in branches if not optimizer.droppable(branch, AcceptAll)]
+    if len(kept) != len(branches):
+        optimizer.report.append(f"{validator.location}: dropped {len(branches) - len(kept)} allOf subschema(s) that accept everything")
+    validator._validators = kept
+    if not kept:
+        return optimizer.replace(
+            validator,
+            AcceptAll(schema=True, location=validator.location, parent=validator.parent),
+            "allOf where every subschema accepts everything replaced with true",
+        )
+    if len(kept) == 1:
+        return optimizer.replace(validator, kept[0], "allOf with a single subschema replaced by the subschema")
+    return validator
+
+
+def _simplify_any_of(optimizer: _Optimizer, validator: AnyOf) -> AValidator:
+    branches = [optimizer.simplify(branch) for branch in validator._validators]
+    if any(isinstance(branch, AcceptAll) for branch in branches):
+        return optimizer.replace(
+            validator,
+            AcceptAll(schema=True, location=validator.location, parent=validator.parent),
+            "anyOf with a subschema that accepts everything replaced with true",
+        )
+    return _drop_rejecting_branches(optimizer, validator, branches, "anyOf")
+
+
+def _simplify_one_of(optimizer: _Optimizer, validator: OneOf) -> AValidator:
+    branches = [optimizer.simplify(branch) for branch in validator._validators]
+    return _drop_rejecting_branches(optimizer, validator, branches, "oneOf")
+
+
+def _drop_rejecting_branches(optimizer, validator, branches, keyword):
+    "branches that reject everything can never be the branch that passes"
+    kept = [branch for branch in branches if not optimizer.droppable(branch, RejectAll)]
+    if len(kept) != len(branches):
+        optimizer.report.append(
+            f"{validator.location}: dropped {len(branches) - len(kept)} {keyword} subschema(s) that reject everything"
+        )
+    validator._validators = branches = kept
+    if not branches:
+        return optimizer.replace(
+            validator,
+            RejectAll(schema=False, location=validator.location, parent=validator.parent),
+            f"{keyword} where every subschema rejects everything replaced with false",
+        )
+    if len(branches) == 1:
+        return optimizer.replace(validator, branches[0], f"{keyword} with a single subschema replaced by the subschema")
+    return validator
+
+
+def _simplify_not(optimizer: _Optimizer, validator: Not) -> AValidator:
+    validator._validator = optimizer.simplify(validator._validator)
+    if isinstance(validator._validator, AcceptAll):
+        return optimizer.replace(
+            validator,
+            RejectAll(schema=False, location=validator.location, parent=validator.parent),
+            "not of a schema that accepts everything replaced with false",
+        )
+    if isinstance(validator._validator, RejectAll):
+        return optimizer.replace(
+            validator,
+            AcceptAll(schema=True, location=validator.location, parent=validator.parent),
+            "not of a schema that rejects everything replaced with true",
+        )
+    return validator
+
+
+def _simplify_if_else_then(optimizer: _Optimizer, validator: IfElseThen) -> AValidator:
+    for attribute in ["_if_validator", "_then_validator", "_else_validator"]:
+        if getattr(validator, attribute):
+            setattr(validator, attribute, optimizer.simplify(getattr(validator, attribute)))
+    if isinstance(validator._if_validator, (AcceptAll, RejectAll)):
+        branch = (
+            validator._then_validator
+            if isinstance(validator._if_validator, AcceptAll)
+            else validator._else_validator
+        )
+        return optimizer.replace(
+            validator,
+            branch or AcceptAll(schema=True, location=validator.location, parent=validator.parent),
+            "if that is always true or always false replaced by the branch that applies",
+        )
+    return validator
+
+
+def _simplify_enum(optimizer: _Optimizer, validator: Enum) -> AValidator:
+    if len(validator.value) != 1:
+        return validator
+    const = Const(schema={"const": validator.value[0]}, location=validator.location, parent=validator.parent)
+    const.location = validator.location
+    return optimizer.replace(validator, const, "enum with a single value replaced with const")
+
+
+def _simplify_items(optimizer: _Optimizer, validator) -> AValidator:
+    "validator is an _Items, left unannotated since its attributes are typed as the results of build_validator"
+    if validator._items_validator:
+        validator._items_validator = optimizer.simplify(validator._items_validator)
+    validator._items_validators = [optimizer.simplify(item) for item in validator._items_validators]
+    if validator._additional_items_validator:
+        validator._additional_items_validator = optimizer.simplify(validator._additional_items_validator)
+    if isinstance(validator._items_validator, AcceptAll) or not (
+        validator._items_validator or validator._items_validators or validator._additional_items_validator
+    ):
+        return optimizer.replace(
+            validator,
+            AcceptAll(schema=True, location=validator.location, parent=validator.parent),
+            "items that accepts every item dropped",
+        )
+    return validator
+
+
+def _simplify_contains(optimizer: _Optimizer, validator: _Contains) -> AValidator:
+    if validator._validator:
+        validator._validator = optimizer.simplify(validator._validator)
+    return validator
+
+
+def _simplify_property(optimizer: _Optimizer, validator: _Property) -> AValidator:
+    validator._validators = {key: optimizer.simplify(value) for key, value in validator._validators.items()}
+    validator._pattern_validators = {
+        regex: optimizer.simplify(value) for regex, value in validator._pattern_validators.items()
+    }
+    if validator._additional_validator:
+        validator._additional_validator = optimizer.simplify(validator._additional_validator)
+    if validator._additional_validator is None:
+        # without additionalProperties the properties that accept everything don't affect anything
+        for validators in [validator._validators, validator._pattern_validators]:
+            for key, value in list(validators.items()):
+                if optimizer.droppable(value, AcceptAll):
+                    del validators[key]
+                    optimizer.report.append(f"{value.location}: dropped since it accepts everything")
+    if optimizer.droppable(validator._additional_validator, AcceptAll) and not (
+        validator._validators or validator._pattern_validators
+    ):
+        validator._additional_validator = None
+    if not (validator._validators or validator._pattern_validators or validator._additional_validator):
+        return optimizer.replace(
+            validator,
+            AcceptAll(schema=True, location=validator.location, parent=validator.parent),
+            "properties that accept every property dropped",
+        )
+    return validator
+
+
+def _simplify_keyword_group(kind: str):
+    "simplifies each keyword of an _Object or _Array and drops the ones that accept everything"
+
+    def simplify(optimizer: _Optimizer, validator) -> AValidator:
+        keywords = [optimizer.simplify(keyword) for keyword in validator._keywords]
+        validator._keywords = [keyword for keyword in keywords if not optimizer.droppable(keyword, AcceptAll)]
+        if not validator._keywords:
+            return optimizer.replace(
+                validator,
+                AcceptAll(schema=True, location=validator.location, parent=validator.parent),
+                f"{kind} keywords that accept every {kind} dropped",
+            )
+        return validator
+
+    return simplify
+
+
+def _simplify_property_names(optimizer: _Optimizer, validator: _PropertyNames) -> AValidator:
+    validator._validator = optimizer.simplify(validator._validator)
+    if isinstance(validator._validator, AcceptAll):
+        return optimizer.replace(
+            validator,
+            AcceptAll(schema=True, location=validator.location, parent=validator.parent),
+            "propertyNames that accepts every name dropped",
+        )
+    return validator
+
+
+def _simplify_defs(optimizer: _Optimizer, validator: Defs) -> AValidator:
+    validator._validators = {key: optimizer.simplify(value) for key, value in validator._validators.items()}
+    if not validator._validators:
+        return optimizer.replace(
+            validator,
+            AcceptAll(schema=True, location=validator.location, parent=validator.parent),
+            "empty $defs dropped",
+        )
+    return validator
+
+
+SIMPLIFIERS: typing.Dict[type, typing.Callable] = {
+    Validator: _simplify_validator,
+    AllOf: _simplify_all_of,
+    AnyOf: _simplify_any_of,
+    OneOf: _simplify_one_of,
+    Not: _simplify_not,
+    IfElseThen: _simplify_if_else_then,
+    Enum: _simplify_enum,
+    _Items: _simplify_items,
+    _Contains: _simplify_contains,
+    _Property: _simplify_property,
+    _Object: _simplify_keyword_group("object"),
+    _Array: _simplify_keyword_group("array"),
+    _PropertyNames: _simplify_property_names,
+    Defs: _simplify_defs,
+}
@@ -0,0 +1,76 @@
+import unittest
+
+from pyjschema.exceptions import SchemaError
+
+from .context import BUILD_VALIDATOR, VOCABULARIES
+from .optimizer import optimize
+from .types import Const, RejectAll
+from .validator_construction import build_validator, construct_validator
+from .vocabularies import get_vocabularies
+
+
+def build_and_optimize(schema):
+    VOCABULARIES.set(get_vocabularies(schema=schema))
+    BUILD_VALIDATOR.set(build_validator)
+    return optimize(build_validator(schema=schema, location="", parent=None))
+
+
+class TestOptimize(unittest.TestCase):
+    def test_all_of_single_subschema(self):
+        validate = construct_validator({"allOf": [{"type": "string"}]}, optimize=True)
+        self.assertIn(
+            "/allOf: allOf with a single subschema replaced by the subschema",
+            validate.optimizations,
+        )
+        self.assertTrue(validate("a"))
+        self.assertFalse(validate(1))
+
+    def test_not_true(self):
+        validator, _ = build_and_optimize({"properties": {"a": {"not": True}}})
+        self.assertIsInstance(validator._validators["properties"]._property._validators["a"], RejectAll)
+
+    def test_accepts_everything(self):
+        validator, _ = build_and_optimize(
+            {"items": {"allOf": [True, {}], "properties": {"a": True}}}
+        )
+        self.assertEqual(validator._validators, {})
+
+    def test_enum_with_single_value(self):
+        validator, _ = build_and_optimize({"enum": [1]})
+        self.assertIsInstance(validator._validators["enum"], Const)
+
+    def test_unreachable_defs_removed(self):
+        validate = construct_validator(
+            {
+                "$defs": {"used": {"type": "integer"}, "unused": {"type": "string"}},
+                "properties": {"a": {"$ref": "#/$defs/used"}},
+            },
+            optimize=True,
+        )
+        self.assertEqual(
+            validate.optimizations, ["/$defs/unused: removed unreachable $defs entry"]
+        )
+        self.assertTrue(validate({"a": 1}))
+        self.assertFalse(validate({"a": "1"}))
+
+    def test_type_intersection(self):
+        validate = construct_validator(
+            {"type": ["string", "integer"], "allOf": [{"type": "number"}]},
+            optimize=True,
+        )
+        self.assertTrue(validate(1))
+        self.assertFalse(validate(1.5))
+        self.assertFalse(validate("a"))
+
+    def test_unresolvable_ref_still_raises(self):
+        for schema in [
+            {"allOf": [False, {"$ref": "#/$defs/missing"}]},
+            {"not": {"anyOf": [True, {"$ref": "#/$defs/missing"}]}},
+        ]:
+            for optimize_ in [False, True]:
+                with self.subTest(schema=schema, optimize=optimize_), self.assertRaises(SchemaError):
+                    construct_validator(schema, optimize=optimize_)
+
+    def test_off_by_default(self):
+        validate = construct_validator({"allOf": [{"type": "string"}]})
+        self.assertEqual(validate.optimizations, [])
@@ -19,6 +19,25 @@ def raise_if_not_ready(func):
     return wrapper
 
 
+def lookup_validator(uri, uri_to_validator):
+    """
+    returns the validator the uri points to or None.
+    A validator that is shared by identical subschemas is only in uri_to_validator under their locations, so
+    a location below one of them is found below the location where the validator was built instead
+    """
+    validator = uri_to_validator.get(uri)
+    if validator is not None or "#/" not in uri:
+        return validator
+    base, pointer = uri.split("#", 1)
+    prefix = pointer
+    while "/" in prefix:
+        prefix = prefix.rsplit("/", 1)[0]
+        shared = uri_to_validator.get(f"{base}#{prefix}")
+        if shared is not None and prefix in shared.aliases:
+            return lookup_validator(f"{base}#{shared.location}{pointer[len(prefix):]}", uri_to_validator)
+    return None
+
+
 class Ref(Keyword):
     keyword = "$ref"
 
@@ -46,6 +65,10 @@ class Ref(Keyword):
             )
         )
 
+    @raise_if_not_ready
+    def is_valid(self, instance):
+        return self._validator.is_valid(instance=instance)
+
     def resolve(self, uri_to_validator):
         abs_uri = self._get_abs_uri()
         self.abs_uri = abs_uri
@@ -61,7 +84,7 @@ class Ref(Keyword):
         return to_canonical_uri(uri=self.value, current_base_uri=self.base_uri or "")
 
     def _get_validator(self, abs_uri, uri_to_validator):
-        validator = uri_to_validator.get(abs_uri)
+        validator = lookup_validator(abs_uri, uri_to_validator)
 
         if validator:
             return validator
@@ -117,5 +140,9 @@ class RecursiveRef(Keyword):
             )
         )
 
+    @raise_if_not_ready
+    def is_valid(self, instance):
+        return self._validator.is_valid(instance=instance)
+
     def __repr__(self):
         return f"RecursiveRef({self._validator})"
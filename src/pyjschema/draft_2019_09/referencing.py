@@ -1,4 +1,5 @@
-from typing import Dict
+import itertools
+from typing import Dict, Iterable, Set
 
 from uritools import urijoin
 
@@ -9,7 +10,7 @@ from .validator import Validator
 
 
 def _populate_uri_to_validator(
-    validator: AValidator, root_base_uri, uri_to_validator: Dict,
+    validator: AValidator, root_base_uri, uri_to_validator: Dict, seen=None,
 ):
     """
     This needs to be run after _set_to_canonical_uri because _set_to_canonical_uri propagates
@@ -19,13 +20,21 @@ def _populate_uri_to_validator(
     - canonical id
     - canonical id + location
     - canonical id + anchor
+    A validator shared by identical subschemas is also added under their locations, the locations below
+    those are worked out when a reference needs them (see lookup_validator)
     """
+    seen = set() if seen is None else seen
+    if id(validator) in seen:
+        return
+    seen.add(id(validator))
+
     if (
         isinstance(validator, (Keyword, AValidator))
         and not isinstance(validator, KeywordGroup)
         and validator.location
     ):
-        uri_to_validator[urijoin(root_base_uri, "#" + validator.location)] = validator
+        for location in (validator.location,) + validator.aliases:
+            uri_to_validator[urijoin(root_base_uri, "#" + location)] = validator
 
     if validator.id is not None and isinstance(validator, Validator):
         validator_id = validator.id.rstrip("/")
@@ -41,10 +50,15 @@ def _populate_uri_to_validator(
             validator=sub_validator,
             root_base_uri=root_base_uri,
             uri_to_validator=uri_to_validator,
+            seen=seen,
         )
 
 
-def _resolve_references(validator: AValidator, uri_to_validator: Dict):
+def _resolve_references(validator: AValidator, uri_to_validator: Dict, seen=None):
+    seen = set() if seen is None else seen
+    if id(validator) in seen:
+        return
+    seen.add(id(validator))
 
     if isinstance(validator, Ref):
         validator.resolve(uri_to_validator=uri_to_validator)
@@ -54,7 +68,7 @@ def _resolve_references(validator: AValidator, uri_to_validator: Dict):
 
     for sub_validator in validator.sub_validators():
         _resolve_references(
-            validator=sub_validator, uri_to_validator=uri_to_validator,
+            validator=sub_validator, uri_to_validator=uri_to_validator, seen=seen,
         )
 
 
@@ -71,3 +85,80 @@ def resolve_references(root_validator, uri_to_validator):
         validator=root_validator, uri_to_validator=uri_to_validator,
     )
     return uri_to_validator
+
+
+def inline_references(root_validator: AValidator):
+    """
+    Run after resolve_references. Every $ref that isn't part of a cycle is replaced by the validator
+    it points to so validating doesn't go through the Ref on every call.
+    References that are part of a cycle (recursive schemas) have to stay as they are.
+    """
+    in_cycles = _in_cycles(root_validator)
+    seen: Set[int] = set()
+    stack = [root_validator]
+    while stack:
+        validator = stack.pop()
+        if id(validator) in seen:
+            continue
+        seen.add(id(validator))
+        if isinstance(validator, Validator):
+            ref = validator._validators.get("$ref")
+            if isinstance(ref, Ref) and id(ref) not in in_cycles:
+                validator._validators["$ref"] = ref._validator
+                validator._validators_by_type.clear()
+                validator._is_valid_by_type.clear()
+        stack.extend(_edges(validator))
+
+
+def _edges(validator: AValidator) -> Iterable[AValidator]:
+    yield from validator.sub_validators()
+    if isinstance(validator, (Ref, RecursiveRef)):
+        yield validator._validator
+
+
+def _in_cycles(root_validator: AValidator) -> Set[int]:
+    """
+    returns the ids of the validators that are part of a cycle once references are followed.
+    This is Tarjan's strongly connected components algorithm, without recursion so deep schemas are fine
+    """
+    counter = itertools.count()
+    index: Dict[int, int] = {}
+    lowlink: Dict[int, int] = {}
+    stack: list = []
+    on_stack: Set[int] = set()
+    in_cycles: Set[int] = set()
+
+    def visit(validator):
+        index[id(validator)] = lowlink[id(validator)] = next(counter)
+        stack.append(validator)
+        on_stack.add(id(validator))
+        work.append((validator, iter(_edges(validator))))
+
+    work: list = []
+    visit(root_validator)
+    while work:
+        validator, edges = work[-1]
+        for edge in edges:
+            if id(edge) not in index:
+                visit(edge)
+                break
+            if id(edge) in on_stack:
+                lowlink[id(validator)] = min(lowlink[id(validator)], index[id(edge)])
+                if edge is validator:
+                    in_cycles.add(id(validator))
+        else:
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[id(parent)] = min(lowlink[id(parent)], lowlink[id(validator)])
+            if lowlink[id(validator)] == index[id(validator)]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(id(member))
+                    component.append(id(member))
+                    if member is validator:
+                        break
+                if len(component) > 1:
+                    in_cycles.update(component)
+    return in_cycles
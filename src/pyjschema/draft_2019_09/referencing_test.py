@@ -2,6 +2,7 @@ import unittest
 
 from .ref import Ref
 from .referencing import _populate_uri_to_validator, _resolve_references
+from .testing import build
 from .validator import Validator
 
 
@@ -82,3 +83,35 @@ class Test_ResolveReferences(unittest.TestCase):
 
         self.assertTrue(sub_validator1.resolved)
         self.assertTrue(sub_validator2.resolved)
+
+
+class TestInlineReferences(unittest.TestCase):
+    def property_ref(self, validator, name):
+        return validator._validators["properties"]._property._validators[name]._validators["$ref"]
+
+    def test_ref_is_inlined(self):
+        validator = build(
+            {
+                "properties": {"a": {"$ref": "#/$defs/string"}},
+                "$defs": {"string": {"type": "string"}},
+            }
+        )
+        self.assertIs(
+            self.property_ref(validator, "a"),
+            validator._validators["$defs"]._validators["string"],
+        )
+
+    def test_recursive_refs_are_kept(self):
+        validator = build(
+            {
+                "properties": {"self": {"$ref": "#"}, "tree": {"$ref": "#/$defs/node", "type": "object"}},
+                "$defs": {
+                    "node": {"properties": {"children": {"$ref": "#/$defs/nodes"}}},
+                    "nodes": {"items": {"$ref": "#/$defs/node"}},
+                },
+            }
+        )
+        self.assertIsInstance(self.property_ref(validator, "self"), Ref)
+        node = self.property_ref(validator, "tree")
+        self.assertIs(node, validator._validators["$defs"]._validators["node"])
+        self.assertIsInstance(self.property_ref(node, "children"), Ref)
@@ -0,0 +1,69 @@
+"""
+With share_subschemas=True, subschemas that are identical are built once and the validator is shared between every place they appear.
+e.g a generated schema that repeats {"type": ["null", "string"]} for thousands of properties ends up with
+one validator for it.
+
+A subschema that contains $id, $anchor, $recursiveAnchor or $recursiveRef is never shared since what it
+means depends on where it is. $ref is resolved against the base URI so that is part of what has to match.
+A failure in a shared subschema reports the keywordLocation of the first place it appears, which is why this is
+opt-in.
+"""
+import typing
+
+from pyjschema.common import AValidator
+
+UNSHAREABLE_KEYWORDS = frozenset(["$id", "$anchor", "$recursiveAnchor", "$recursiveRef"])
+
+
+class SharedSubschemas:
+    def __init__(self):
+        self._validators: typing.Dict[typing.Tuple[typing.Optional[str], int], AValidator] = {}
+        # every distinct structure gets a small int so that the key of a schema is a flat tuple,
+        # which keeps working out the keys of all the subschemas in a schema linear in its size
+        self._interned: typing.Dict[typing.Tuple, int] = {}
+        self._keys: typing.Dict[int, typing.Tuple[typing.Any, typing.Optional[int]]] = {}
+
+    def get(self, schema: dict, base_uri) -> typing.Optional[AValidator]:
+        key = self.key(schema)
+        if key is None:
+            return None
+        return self._validators.get((base_uri, key))
+
+    def add(self, schema: dict, base_uri, validator: AValidator):
+        key = self.key(schema)
+        if key is not None:
+            self._validators[(base_uri, key)] = validator
+
+    def key(self, value) -> typing.Optional[int]:
+        "returns None when the value can't be shared"
+        memo = self._keys.get(id(value))
+        if memo is not None and memo[0] is value:
+            return memo[1]
+        structure: typing.Optional[typing.Tuple]
+        if isinstance(value, dict):
+            structure = (
+                None
+                if UNSHAREABLE_KEYWORDS & value.keys()
+                else self._structure("object", value.items())
+            )
+        elif isinstance(value, list):
+            structure = self._structure("array", enumerate(value))
+        else:
+            # the type is part of the key since True == 1 and 1 == 1.0 but the messages show them differently
+            structure = (type(value).__name__, value)
+        key = (
+            None
+            if structure is None
+            else self._interned.setdefault(structure, len(self._interned))
+        )
+        self._keys[id(value)] = (value, key)
+        return key
+
+    def _structure(self, type_, items) -> typing.Optional[typing.Tuple]:
+        structure: typing.List[typing.Any] = [type_]
+        for name, item in items:
+            key = self.key(item)
+            if key is None:
+                return None
+            structure += [name, key]
+        return tuple(structure)
@@ -0,0 +1,70 @@
+import unittest
+
+from .sharing import SharedSubschemas
+from .testing import build
+from .validator_construction import construct_validator
+
+
+def properties(validator):
+    return validator._validators["properties"]._property._validators
+
+
+def failed_keywords(result):
+    if not result.sub_results:
+        return [result.keywordLocation]
+    return [location for sub_result in result.sub_results for location in failed_keywords(sub_result)]
+
+
+class TestSharedSubschemas(unittest.TestCase):
+    def test_identical_subschemas_are_shared(self):
+        validator = build(
+            {
+                "properties": {
+                    "a": {"type": ["null", "string"]},
+                    "b": {"type": ["null", "string"]},
+                    "c": {"type": ["null", "integer"]},
+                }
+            },
+            share_subschemas=True,
+        )
+        self.assertIs(properties(validator)["a"], properties(validator)["b"])
+        self.assertIsNot(properties(validator)["a"], properties(validator)["c"])
+
+    def test_not_shared(self):
+        for description, schema in [
+            ("different base uri", {"$id": "http://example.com/a", "type": "string"}),
+            ("$anchor", {"$anchor": "a", "type": "string"}),
+        ]:
+            with self.subTest(description):
+                validator = build({"properties": {"a": schema, "b": {"type": "string"}}}, share_subschemas=True)
+                self.assertIsNot(properties(validator)["a"], properties(validator)["b"])
+
+    def test_not_shared_by_default(self):
+        schema = {"properties": {"a": {"type": "string"}, "b": {"type": "string"}}}
+        validator = build(schema)
+        self.assertIsNot(properties(validator)["a"], properties(validator)["b"])
+        self.assertEqual(failed_keywords(construct_validator(schema)({"b": 1})), ["/properties/b/type"])
+        self.assertEqual(
+            failed_keywords(construct_validator(schema, share_subschemas=True)({"b": 1})), ["/properties/a/type"]
+        )
+
+    def test_keys(self):
+        shared_subschemas = SharedSubschemas()
+        self.assertEqual(shared_subschemas.key({"const": [1]}), shared_subschemas.key({"const": [1]}))
+        self.assertNotEqual(shared_subschemas.key({"const": 1}), shared_subschemas.key({"const": True}))
+        self.assertNotEqual(shared_subschemas.key({"const": 1}), shared_subschemas.key({"const": 1.0}))
+        self.assertIsNone(shared_subschemas.key({"items": {"$recursiveRef": "#"}}))
+
+    def test_ref_to_the_other_location(self):
+        validate = construct_validator(
+            {
+                "properties": {
+                    "a": {"items": {"type": "string"}},
+                    "b": {"items": {"type": "string"}},
+                    "c": {"$ref": "#/properties/b/items"},
+                }
+            },
+            share_subschemas=True,
+        )
+        self.assertTrue(validate({"c": "string"}))
+        self.assertFalse(validate({"c": 1}))
@@ -0,0 +1,45 @@
+"""
+Helpers shared by the unit tests of the validators.
+"""
+import typing
+
+from pyjschema.common import AValidator
+
+from .validator_construction import build_validator_and_resolve_references
+from .vocabularies import get_vocabularies
+
+
+def build(schema, **kwargs):
+    "the validator tree of a schema with its references resolved - without the validate function around it"
+    return build_validator_and_resolve_references(
+        schema=schema, vocabularies=get_vocabularies(schema=schema), uri_to_validator={}, **kwargs
+    )
+
+
+def build_keyword(schema, kind):
+    "the keyword or keyword group of this class among the keywords of the schema"
+    return next(keyword for keyword in build(schema)._validators.values() if isinstance(keyword, kind))
+
+
+class Recorder:
+    """
+    Stands in for a validator and appends (name, method, instance) to calls for every instance it checks
+    """
+
+    def __init__(self, validator: AValidator, calls: typing.List, name=None):
+        self._validator = validator
+        self._calls = calls
+        self._name = name
+
+    def __call__(self, instance, location):
+        self._calls.append((self._name, "__call__", instance))
+        return self._validator(instance=instance, location=location)
+
+    def is_valid(self, instance):
+        self._calls.append((self._name, "is_valid", instance))
+        return self._validator.is_valid(instance=instance)
+
+
+def recorders(validators: typing.Iterable[AValidator], calls: typing.List) -> typing.List[Recorder]:
+    "a Recorder for each validator, named by its index"
+    return [Recorder(validator, calls, name=index) for index, validator in enumerate(validators)]
@@ -1,10 +1,13 @@
 import itertools
 import typing
-from itertools import filterfalse
 
-from pyjschema.common import Keyword, KeywordGroup
-from pyjschema.draft_2019_09.context import BUILD_VALIDATOR
-from pyjschema.utils import validate_only, ValidationResult
+from pyjschema.common import AValidator, Keyword, KeywordGroup
+from pyjschema.draft_2019_09.context import BUILD_VALIDATOR, VOCABULARIES
+from pyjschema.utils import collect_failures, validate_only, ValidationResult
+
+from .primitives import canonical
+
+INFINITY = float("inf")
 
 
 class _Items(KeywordGroup):
@@ -45,28 +48,26 @@ class _Items(KeywordGroup):
     def __repr__(self):
         return f"Items(items_validator(s)={self._items_validator or self._items_validators}, add_item_validator={self._additional_items_validator})"
 
+    def _rest(self) -> typing.Optional[AValidator]:
+        "the validator for the items after the ones items lists a validator for"
+        if self._items_validator:
+            return self._items_validator
+        # additionalItems is only built when items is a list, an empty one too
+        return self._additional_items_validator
+
+    def _validators(self) -> typing.Iterable:
+        if not self._items_validators:
+            return itertools.repeat(self._rest())
+        return itertools.chain(self._items_validators, itertools.repeat(self._rest()))
+
     @validate_only(type_=list)
     def __call__(self, instance, location):
-        self._validators = []
-        if self._items_validator:
-            self._validators = itertools.repeat(self._items_validator)
-        elif self._items_validators:
-            if self._additional_items_validator:
-                self._validators = itertools.chain(
-                    self._items_validators,
-                    itertools.repeat(self._additional_items_validator),
-                )
-            else:
-                self._validators = self._items_validators
-
-        results = filterfalse(
-            bool,
-            (
-                validator(instance=item, location=f"{location}/{i}")
-                for i, (item, validator) in enumerate(zip(instance, (self._validators)))
-            ),
+        # the location of an item is only worked out for the items that fail
+        results = collect_failures(
+            validator(instance=item, location=(location, i))
+            for i, (item, validator) in enumerate(zip(instance, self._validators()))
+            if validator is not None and not validator.is_valid(instance=item)
         )
-        results = list(results)
         return (
             True
             if not results
@@ -78,6 +79,13 @@ class _Items(KeywordGroup):
             )
         )
 
+    @validate_only(type_=list)
+    def is_valid(self, instance):
+        for item, validator in zip(instance, self._validators()):
+            if validator is not None and not validator.is_valid(instance=item):
+                return False
+        return True
+
     def sub_validators(self):
         if self._items_validator:
             yield self._items_validator
@@ -105,56 +113,52 @@ class _Contains(KeywordGroup):
         )
         self.maxContainsValue = maxContains if maxContains else float("inf")
         self.minContainsValue = minContains if minContains else -float("inf")
+        # without maxContains the outcome is known once there are enough matches, with it once there are too many
+        self._enough = (
+            max(self.minContainsValue, 1) if self.maxContainsValue == INFINITY else self.maxContainsValue + 1
+        )
 
     @validate_only(type_=list)
     def __call__(self, instance, location):
+        if not self._validator or self.is_valid(instance=instance):
+            return True
+        count = self.count(instance)
+        if count == 0:
+            return ValidationResult(
+                message="This doesnt contain an item that matches this",
+                keywordLocation=f"{self.location}/contains",
+                location=location,
+            )
+        if count < self.minContainsValue:
+            return ValidationResult(
+                message=f"This contains less than {self.minContainsValue} matches",
+                keywordLocation=f"{self.location}/minContains",
+                location=location,
+            )
+        return ValidationResult(
+            message=f"This contains more than {self.maxContainsValue} matches",
+            keywordLocation=f"{self.location}/maxContains",
+            location=location,
+        )
 
-        if self._validator:
-            count = 0
-            for value in instance:
-                res = self._validator(instance=value, location=location)
-
-                if res:
-                    count += 1
-
-            sub_results = []
-            if count == 0:
-                sub_results.append(
-                    ValidationResult(
-                        message="This doesnt contain an item that matches this",
-                        keywordLocation=f"{self.location}/contains",
-                        location=location,
-                    )
-                )
+    def count(self, instance) -> int:
+        "the number of matches - counting stops as soon as the outcome is known, see _enough"
+        if self._validator is None:
+            return 0
+        count = 0
+        for value in instance:
+            if self._validator.is_valid(instance=value):
+                count += 1
+                if count >= self._enough:
+                    break
+        return count
 
-            else:
-                if not (self.minContainsValue <= count):
-                    sub_results.append(
-                        ValidationResult(
-                            message=f"This contains less than {self.minContainsValue} matches",
-                            keywordLocation=f"{self.location}/minContains",
-                            location=location,
-                        )
-                    )
-                if not (count <= self.maxContainsValue):
-                    sub_results.append(
-                        ValidationResult(
-                            message=f"This contains more than {self.maxContainsValue} matches",
-                            keywordLocation=f"{self.location}/maxContains",
-                            location=location,
-                        )
-                    )
-            if sub_results:
-                return ValidationResult(  # this is technically wrong since it combines more than one result
-                    message="",
-                    location=location,
-                    keywordLocation="",  # since this is a virtual keyword
-                    sub_results=sub_results,
-                )
-            else:
-                return True
-        else:
+    @validate_only(type_=list)
+    def is_valid(self, instance):
+        if not self._validator:
             return True
+        count = self.count(instance)
+        return count != 0 and self.minContainsValue <= count <= self.maxContainsValue
 
     def sub_validators(self):
         if self._validator:
@@ -163,6 +167,7 @@ class _Contains(KeywordGroup):
 
 class _MinItems(Keyword):
     keyword = "minItems"
+    message = "This has less than {value} items"
 
     @validate_only(type_=list)
     def __call__(self, instance, location):
@@ -171,15 +176,21 @@ class _MinItems(Keyword):
             True
             if res
             else ValidationResult(
-                message=f"This has less than {self.value} items",
+                message=self.message,
+                arguments={"value": self.value},
                 keywordLocation=self.location,
                 location=location,
             )
         )
 
+    @validate_only(type_=list)
+    def is_valid(self, instance):
+        return self.value <= len(instance)
+
 
 class _MaxItems(Keyword):
     keyword = "maxItems"
+    message = "This has more than {value} items"
 
     @validate_only(type_=list)
     def __call__(self, instance, location):
@@ -188,27 +199,160 @@ class _MaxItems(Keyword):
             True
             if res
             else ValidationResult(
-                message=f"This has more than {self.value} items",
+                message=self.message,
+                arguments={"value": self.value},
                 keywordLocation=self.location,
                 location=location,
             )
         )
 
+    @validate_only(type_=list)
+    def is_valid(self, instance):
+        return len(instance) <= self.value
+
 
 class _UniqueItems(Keyword):
     keyword = "uniqueItems"
 
     @validate_only(type_=list)
     def __call__(self, instance, location):
-        if self.value:
-            itemsset = set([str(value) for value in instance])
-
-            # TODO(ope) - actually make sure the values are unique - is this even possible?
-            if len(itemsset) != len(instance):
-                return ValidationResult(
-                    message="This doesnt have unique items",
-                    location=location,
-                    keywordLocation=self.location,
-                )
+        if self.value and not are_unique(instance):
+            first, second = first_duplicate(instance)
+            return ValidationResult(
+                message=f"This doesnt have unique items, the items at {first} and {second} are equal",
+                location=location,
+                keywordLocation=self.location,
+            )
 
         return True
+
+    @validate_only(type_=list)
+    def is_valid(self, instance):
+        return not self.value or are_unique(instance)
+
+
+def are_unique(items) -> bool:
+    try:
+        # python's equality is looser than JSON's (True == 1) so this can only tell that they are unique
+        if len(set(items)) == len(items):
+            return True
+    except TypeError:
+        # arrays and objects can't be hashed
+        pass
+    return first_duplicate(items) is None
+
+
+def first_duplicate(items) -> typing.Optional[typing.Tuple[int, int]]:
+    "returns the indexes of the first two items that are equal or None when every item is unique"
+    seen: typing.Dict[typing.Any, int] = {}
+    for index, item in enumerate(items):
+        first = seen.setdefault(canonical(item), index)
+        if first != index:
+            return first, index
+    return None
+
+
+class _Array(KeywordGroup):
+    """
+    items, additionalItems, contains, minContains, maxContains, minItems, maxItems and uniqueItems in one validator.
+    The length of the array is checked before any of its items, then one pass over the items validates each of them
+    and counts the matches for contains - counting stops as soon as the outcome of contains is known.
+    """
+
+    def __init__(self, schema: dict, location, parent):
+        super().__init__(schema=schema, location=location, parent=parent)
+        vocabularies = VOCABULARIES.get()
+        built: typing.Set[type] = set()
+        self._keywords: typing.List[AValidator] = []
+        for key, KeywordClass in ARRAY_KEYWORDS.items():
+            if key in schema and vocabularies.get(key) is _Array and KeywordClass not in built:
+                built.add(KeywordClass)
+                self._keywords.append(KeywordClass(schema=schema, location=location, parent=parent))
+        # worked out the first time an array is validated - after the optimizer is done with the keywords
+        self._prepared = False
+
+    def _prepare(self):
+        self._shortest, self._longest = 0, INFINITY
+        self._unique = False
+        self._prefix: typing.Tuple[AValidator, ...] = ()
+        self._rest: typing.Optional[AValidator] = None
+        self._matches: typing.Optional[AValidator] = None
+        self._enough = self._most_matches = INFINITY
+        self._fewest_matches = 0
+        for keyword in self._keywords:
+            if isinstance(keyword, _MinItems):
+                self._shortest = max(self._shortest, keyword.value)
+            elif isinstance(keyword, _MaxItems):
+                self._longest = keyword.value
+            elif isinstance(keyword, _UniqueItems):
+                self._unique = bool(keyword.value)
+            elif isinstance(keyword, _Items):
+                self._prefix = tuple(keyword._items_validators)
+                self._rest = keyword._rest()
+            elif isinstance(keyword, _Contains) and keyword._validator:
+                self._matches = keyword._validator
+                self._fewest_matches = max(keyword.minContainsValue, 1)
+                self._most_matches = keyword.maxContainsValue
+                self._enough = keyword._enough
+                # an array can't have more matches than items
+                self._shortest = max(self._shortest, self._fewest_matches)
+        self._every_item = itertools.repeat(self._rest)
+        self._prepared = True
+
+    @validate_only(type_=list)
+    def __call__(self, instance, location):
+        if self.is_valid(instance=instance):
+            return True
+        results = collect_failures(keyword(instance=instance, location=location) for keyword in self._keywords)
+        if len(results) == 1:
+            return results[0]
+        return ValidationResult(
+            message="",
+            location=location,
+            keywordLocation="",  # since this is a virtual keyword
+            sub_results=results,
+        )
+
+    @validate_only(type_=list)
+    def is_valid(self, instance):
+        if not self._prepared:
+            self._prepare()
+        if not self._shortest <= len(instance) <= self._longest:
+            return False
+        matches = self._matches
+        if matches is not None or self._rest is not None:
+            validators = itertools.chain(self._prefix, self._every_item) if self._prefix else self._every_item
+        else:
+            validators = self._prefix
+        count = 0
+        for item, validator in zip(instance, validators):
+            if validator is not None and not validator.is_valid(instance=item):
+                return False
+            if matches is not None and matches.is_valid(instance=item):
+                count += 1
+                if count >= self._enough:
+                    if count > self._most_matches:
+                        return False
+                    # there are enough matches and no maxContains to exceed
+                    matches = None
+        if matches is not None and count < self._fewest_matches:
+            return False
+        return not self._unique or are_unique(instance)
+
+    def sub_validators(self):
+        yield from self._keywords
+
+    def __repr__(self):
+        return f"Array({self._keywords})"
+
+
+ARRAY_KEYWORDS: typing.Dict[str, type] = {
+    "minItems": _MinItems,
+    "maxItems": _MaxItems,
+    "items": _Items,
+    "additionalItems": _Items,
+    "contains": _Contains,
+    "minContains": _Contains,
+    "maxContains": _Contains,
+    "uniqueItems": _UniqueItems,
+}
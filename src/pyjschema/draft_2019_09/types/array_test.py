@@ -1,6 +1,12 @@
+import itertools
 import unittest
 
-from pyjschema.draft_2019_09 import validate
+import parameterized  # type: ignore
+
+from pyjschema.draft_2019_09 import construct_validator, validate
+
+from ..testing import Recorder, build_keyword
+from .array import first_duplicate, _Array, _UniqueItems
 
 
 class Test(unittest.TestCase):
@@ -26,3 +32,67 @@ class Test(unittest.TestCase):
         }
 
         self.assertEqual(bool(validate(schema=schema, instance=instance)), False)
+
+
+class TestUniqueItems(unittest.TestCase):
+    @parameterized.parameterized.expand(
+        [
+            ("strings", ["a", "b", "c"], None),
+            ("bool and int", [1, True, 0, False], None),
+            ("int and float", [1, 2, 1.0], (0, 2)),
+            ("key order", [{"a": 1, "b": 2}, {"b": 2, "a": 1}], (0, 1)),
+            ("number and string", [1, "1"], None),
+            ("nested", [[1, [True]], [1, [1]], [1.0, [True]]], (0, 2)),
+        ]
+    )
+    def test(self, description, instance, duplicate):
+        validator = _UniqueItems(schema={"uniqueItems": True}, location="", parent=None)
+        self.assertEqual(first_duplicate(instance), duplicate)
+        self.assertIs(validator.is_valid(instance), duplicate is None)
+        self.assertEqual(bool(validator(instance=instance, location="")), duplicate is None)
+
+
+class TestArray(unittest.TestCase):
+    @parameterized.parameterized.expand(
+        [
+            ("too short", {"minItems": 2, "items": {"type": "integer"}}, [1], False),
+            ("too long", {"maxItems": 1, "items": {"type": "integer"}}, [1, 2], False),
+            ("item", {"items": {"type": "integer"}}, [1, "2"], False),
+            ("tuple", {"items": [{"type": "integer"}, {"type": "string"}]}, [1, "a", None], True),
+            ("additional item", {"items": [{"type": "integer"}], "additionalItems": {"type": "string"}}, [1, "a", 2], False),
+            ("contains", {"contains": {"type": "string"}}, [1, 2, "a", 3], True),
+            ("no match", {"contains": {"type": "string"}}, [1, 2], False),
+            ("min contains", {"contains": {"type": "string"}, "minContains": 2}, ["a", 1, "b"], True),
+            ("too few matches", {"contains": {"type": "string"}, "minContains": 3}, ["a", 1, "b", 2], False),
+            ("too many matches", {"contains": {"type": "string"}, "maxContains": 1}, ["a", 1, "b"], False),
+            ("more matches than items", {"contains": {"type": "string"}, "minContains": 3}, ["a", "b"], False),
+            ("contains and items", {"contains": {"const": 2}, "items": {"minimum": 1}}, [1, 2, 0], False),
+            ("unique", {"uniqueItems": True, "contains": {"const": 1}}, [1, 2, 1], False),
+            ("empty items list", {"items": [], "additionalItems": False}, [1], False),
+            ("empty items list and array", {"items": [], "additionalItems": False}, [], True),
+            ("empty items list and additional item", {"items": [], "additionalItems": {"type": "string"}}, ["a", 1], False),
+        ]
+    )
+    def test(self, _, schema, instance, expected):
+        for mode, optimize in itertools.product(["interpreted", "codegen"], [False, True]):
+            with self.subTest(mode=mode, optimize=optimize):
+                validate = construct_validator(schema, mode=mode, optimize=optimize)
+                self.assertEqual(validate.is_valid(instance), expected)
+                self.assertEqual(bool(validate(instance)), expected)
+
+    def test_length_checked_first(self):
+        array = build_keyword({"maxItems": 2, "items": {"type": "integer"}}, _Array)
+        array.is_valid([])
+        checked: list = []
+        array._every_item = itertools.repeat(Recorder(array._rest, checked))
+        self.assertFalse(array.is_valid([1, 2, 3]))
+        self.assertTrue(array.is_valid([1, 2]))
+        self.assertEqual(checked, [(None, "is_valid", 1), (None, "is_valid", 2)])
+
+    def test_contains_stops_counting(self):
+        array = build_keyword({"contains": {"type": "string"}, "minContains": 2}, _Array)
+        array.is_valid([])
+        checked: list = []
+        array._matches = Recorder(array._matches, checked)
+        self.assertTrue(array.is_valid(["a", "b", "c", "d"]))
+        self.assertEqual(checked, [(None, "is_valid", "a"), (None, "is_valid", "b")])
@@ -1,91 +1,157 @@
+import math
 import numbers
-
-from pyjschema.common import Keyword
-
-from pyjschema.utils import validate_only, ValidationResult
-
-
-class _MultipleOf(Keyword):
-    keyword = "multipleOf"
-
-    @validate_only(type_=(int, numbers.Number))
-    def __call__(self, instance, location):
-        # using this multipier here so that the precision is better
-        multiplier = 100000
-        instance = instance * multiplier
-        value = self.value * multiplier
-        if (instance % value) != 0:
-            return ValidationResult(
-                message=f"{instance!r} is not a multiple of {self.value!r}",
-                location=location,
-                keywordLocation=self.location,
+import operator
+import typing
+from fractions import Fraction
+
+from pyjschema.common import KeywordGroup
+
+from pyjschema.utils import collect_failures, validate_only, ValidationResult
+
+INFINITY = float("inf")
+
+# (lower bound is exclusive, upper bound is exclusive) -> check that the instance is within the bounds
+RANGE_CHECKS = {
+    (False, False): lambda lower, instance, upper: lower <= instance <= upper,
+    (True, False): lambda lower, instance, upper: lower < instance <= upper,
+    (False, True): lambda lower, instance, upper: lower <= instance < upper,
+    (True, True): lambda lower, instance, upper: lower < instance < upper,
+}
+
+# keyword -> whether the instance and the value of the keyword pass it
+BOUNDS = {
+    "minimum": operator.ge,
+    "exclusiveMinimum": operator.gt,
+    "maximum": operator.le,
+    "exclusiveMaximum": operator.lt,
+}
+
+MESSAGES = {
+    "minimum": "{instance!r} is less than {value!r}",
+    "exclusiveMinimum": "{instance!r} is less than or equal to {value!r}",
+    "maximum": "{instance!r} is more than {value!r}",
+    "exclusiveMaximum": "{instance!r} is more than or equal to {value!r}",
+    "multipleOf": "{instance!r} is not a multiple of {value!r}",
+}
+
+
+class _Number(KeywordGroup):
+    """
+    minimum, exclusiveMinimum, maximum, exclusiveMaximum and multipleOf in one validator.
+    The bounds are folded into the tightest lower and upper bound when the schema is built so an instance
+    goes through one type check and one range comparison.
+    """
+
+    def __init__(self, schema: dict, location, parent):
+        super().__init__(schema=schema, location=location, parent=parent)
+        self.lower, self.lower_keyword = _tightest_bound(
+            schema, inclusive="minimum", exclusive="exclusiveMinimum", tighter=max
+        )
+        self.upper, self.upper_keyword = _tightest_bound(
+            schema, inclusive="maximum", exclusive="exclusiveMaximum", tighter=min
+        )
+        self.multipleOf = schema.get("multipleOf")
+        self._multiple_of_ratio = (
+            None if self.multipleOf is None else decimal_ratio(self.multipleOf)
+        )
+        self._in_range = RANGE_CHECKS[
+            (
+                self.lower_keyword == "exclusiveMinimum",
+                self.upper_keyword == "exclusiveMaximum",
             )
-        return True
-
-
-class _Minimum(Keyword):
-    keyword = "minimum"
+        ]
+        self._lower = -INFINITY if self.lower is None else self.lower
+        self._upper = INFINITY if self.upper is None else self.upper
+        # every bound is checked on its own once the combined one fails so that each one that fails is reported
+        self._bounds = [(keyword, schema[keyword], BOUNDS[keyword]) for keyword in BOUNDS if keyword in schema]
 
     @validate_only(type_=(int, numbers.Number))
     def __call__(self, instance, location):
-        res = self.value <= instance
-        return (
-            True
-            if res
-            else ValidationResult(
-                message=f"{instance!r} is less than {self.value!r}",
-                keywordLocation=self.location,
+        if self.is_valid(instance=instance):
+            return True
+        results = collect_failures(
+            ValidationResult(
+                message=MESSAGES[keyword],
+                arguments={"instance": instance, "value": value},
+                keywordLocation=f"{self.location}/{keyword}",
                 location=location,
             )
+            for keyword, value in self._failures(instance)
         )
-
-
-class _Maximum(Keyword):
-    keyword = "maximum"
-
-    @validate_only(type_=(int, numbers.Number))
-    def __call__(self, instance, location):
-        res = instance <= self.value
-        return (
-            True
-            if res
-            else ValidationResult(
-                message=f"{instance!r} is more than {self.value!r}",
-                keywordLocation=self.location,
-                location=location,
-            )
+        if len(results) == 1:
+            return results[0]
+        return ValidationResult(
+            message="",
+            location=location,
+            keywordLocation="",  # since this is a virtual keyword
+            sub_results=results,
         )
 
-
-class _ExclusiveMinimum(Keyword):
-    keyword = "exclusiveMinimum"
-
     @validate_only(type_=(int, numbers.Number))
-    def __call__(self, instance, location):
-        res = self.value < instance
-        return (
-            True
-            if res
-            else ValidationResult(
-                message=f"{instance!r} is more than or equal to {self.value!r}",
-                keywordLocation=self.location,
-                location=location,
-            )
-        )
-
-
-class _ExclusiveMaximum(Keyword):
-    keyword = "exclusiveMaximum"
+    def is_valid(self, instance):
+        if not self._in_range(self._lower, instance, self._upper):
+            return False
+        if self._multiple_of_ratio is not None:
+            return is_multiple_of_ratio(instance, *self._multiple_of_ratio)
+        return True
 
-    @validate_only(type_=(int, numbers.Number))
-    def __call__(self, instance, location):
-        res = instance < self.value
-        return (
-            True
-            if res
-            else ValidationResult(
-                message=f"{instance!r} is less than or equal to {self.value!r}",
-                keywordLocation=self.location,
-                location=location,
-            )
-        )
+    def _failures(self, instance):
+        for keyword, value, passes in self._bounds:
+            if not passes(instance, value):
+                yield keyword, value
+        if self._multiple_of_ratio is not None and not is_multiple_of_ratio(
+            instance, *self._multiple_of_ratio
+        ):
+            yield "multipleOf", self.multipleOf
+
+    def sub_validators(self):
+        yield from []
+
+    def __repr__(self):
+        return f"Number(lower={self.lower!r}, upper={self.upper!r}, multipleOf={self.multipleOf!r})"
+
+
+def _tightest_bound(schema, inclusive, exclusive, tighter):
+    "returns the bound and the keyword it comes from. An exclusive bound is tighter than an inclusive one of the same value"
+    bounds = [(schema[keyword], keyword) for keyword in (exclusive, inclusive) if keyword in schema]
+    if not bounds:
+        return None, None
+    value = tighter(bound for bound, _ in bounds)
+    return next((bound, keyword) for bound, keyword in bounds if bound == value)
+
+
+def is_multiple_of(instance, value) -> bool:
+    return is_multiple_of_ratio(instance, *decimal_ratio(value))
+
+
+def is_multiple_of_ratio(instance, numerator, denominator) -> bool:
+    """
+    whether instance is a multiple of numerator / denominator, worked out with integers so that it is exact
+    and very large numbers don't overflow
+    """
+    if isinstance(instance, int):
+        if denominator == 1:
+            return instance % numerator == 0
+        return (instance * denominator) % numerator == 0
+    if isinstance(instance, float) and not math.isfinite(instance):
+        return False
+    instance_numerator, instance_denominator = decimal_ratio(instance)
+    return (instance_numerator * denominator) % (instance_denominator * numerator) == 0
+
+
+def decimal_ratio(value) -> typing.Tuple[int, int]:
+    """
+    returns the numerator and denominator of the number as it is written e.g 0.01 is 1/100 and not the
+    binary fraction closest to it that the float holds - which isn't a multiple of anything useful.
+    """
+    if isinstance(value, int):
+        return value, 1
+    if isinstance(value, float):
+        written = repr(value)
+        if "e" not in written:
+            # quicker than Fraction for the common case, 12.34 is 1234/100
+            whole, _, decimals = written.partition(".")
+            return int(whole + decimals), 10 ** len(decimals)
+        value = written
+    fraction = Fraction(value)
+    return fraction.numerator, fraction.denominator
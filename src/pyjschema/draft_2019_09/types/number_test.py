@@ -0,0 +1,67 @@
+import unittest
+
+import parameterized
+
+from .number import _Number, is_multiple_of
+
+
+class TestNumber(unittest.TestCase):
+    @parameterized.parameterized.expand(
+        [
+            ({"minimum": 1, "exclusiveMinimum": 1}, 1, False),
+            ({"minimum": 1, "exclusiveMinimum": 0}, 1, True),
+            ({"maximum": 5, "exclusiveMaximum": 6}, 5, True),
+            ({"maximum": 5, "exclusiveMaximum": 5}, 5, False),
+            ({"minimum": 0, "maximum": 10, "multipleOf": 2}, 4, True),
+            ({"minimum": 0, "maximum": 10, "multipleOf": 2}, 5, False),
+            ({"minimum": 0, "maximum": 10, "multipleOf": 2}, 12, False),
+            ({"multipleOf": 2}, "not a number", True),
+        ]
+    )
+    def test(self, schema, instance, result):
+        validator = _Number(schema=schema, location="", parent=None)
+        self.assertEqual(result, validator.is_valid(instance=instance))
+        self.assertEqual(result, bool(validator(instance=instance, location="")))
+
+    def test_tightest_bounds(self):
+        validator = _Number(
+            schema={"minimum": 3, "exclusiveMinimum": 1, "maximum": 8, "exclusiveMaximum": 8},
+            location="",
+            parent=None,
+        )
+        self.assertEqual((validator.lower, validator.lower_keyword), (3, "minimum"))
+        self.assertEqual((validator.upper, validator.upper_keyword), (8, "exclusiveMaximum"))
+
+    @parameterized.parameterized.expand(
+        [
+            ({"maximum": 10, "multipleOf": 3}, 11, ["/maximum", "/multipleOf"]),
+            ({"minimum": 1, "exclusiveMinimum": 1}, 0, ["/minimum", "/exclusiveMinimum"]),
+            ({"minimum": 1, "exclusiveMinimum": 1}, 1, ["/exclusiveMinimum"]),
+            ({"maximum": 5, "exclusiveMaximum": 3}, 4, ["/exclusiveMaximum"]),
+        ]
+    )
+    def test_every_failing_keyword_is_reported(self, schema, instance, expected):
+        validator = _Number(schema=schema, location="", parent=None)
+        result = validator(instance=instance, location="")
+        sub_results = result.sub_results or [result]
+        self.assertEqual([sub_result.keywordLocation for sub_result in sub_results], expected)
+
+
+class TestIsMultipleOf(unittest.TestCase):
+    @parameterized.parameterized.expand(
+        [
+            (19.99, 0.01, True),
+            (0.3, 0.1, True),
+            (0.0075, 0.0001, True),
+            (19.995, 0.01, False),
+            (-4.5, 1.5, True),
+            (10, 2.5, True),
+            (10.0, 3, False),
+            (1e308, 0.123456789, False),
+            (10 ** 400, 7, False),
+            (7 * 10 ** 400, 0.5, True),
+            (1.5e-07, 5e-08, True),
+        ]
+    )
+    def test(self, instance, value, result):
+        self.assertIs(is_multiple_of(instance, value), result)
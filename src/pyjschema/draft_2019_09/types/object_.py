@@ -1,8 +1,16 @@
-import re
+import typing
 
-from pyjschema.common import Keyword, KeywordGroup
-from pyjschema.draft_2019_09.context import BUILD_VALIDATOR
-from pyjschema.utils import validate_only, ValidationResult
+from pyjschema.common import AValidator, Keyword, KeywordGroup
+from pyjschema.draft_2019_09.context import BUILD_VALIDATOR, VOCABULARIES
+from pyjschema.patterns import PatternSet
+from pyjschema.utils import CacheInfo, collect_failures, compile_regex, validate_only, ValidationResult
+
+# the number of property names each properties/patternProperties/additionalProperties remembers
+KEY_CACHE_SIZE = 1024
+# the number of distinct key tuples (shapes) each object schema remembers a plan for
+SHAPE_CACHE_SIZE = 256
+# objects with more keys than this are used as maps rather than records, a plan for them is unlikely to be used again
+SHAPE_MAX_KEYS = 64
 
 
 class _Property(KeywordGroup):
@@ -34,7 +42,7 @@ class _Property(KeywordGroup):
         )
         self._pattern_validators = (
             {
-                re.compile(key): build_validator(
+                compile_regex(key): build_validator(
                     schema=properties,
                     location=f"{location}/patternProperties/{key}",
                     parent=self,
@@ -44,19 +52,18 @@ class _Property(KeywordGroup):
             if patternProperties
             else {}
         )
+        self._patterns = PatternSet(self._pattern_validators)
+        # property name -> the validators that apply to its value, worked out the first time the name is seen
+        self._key_validators: typing.Dict[str, typing.Tuple[AValidator, ...]] = {}
+        self._key_lookups = 0
+        self._key_misses = 0
 
     @validate_only(type_=dict)
     def __call__(self, instance, location):
-
-        results = _validate(
-            property_validators=self._validators,
-            additional_validator=self._additional_validator,
-            pattern_validators=self._pattern_validators,
-            instance=instance,
-            location=location,
+        results = collect_failures(
+            validator(instance=value, location=(location, key)) for key, value, validator in self._checks(instance)
         )
-        results = list(results)
-        if all(results):
+        if not results:
             return True
         else:
             return ValidationResult(
@@ -66,6 +73,80 @@ class _Property(KeywordGroup):
                 sub_results=results,
             )
 
+    @validate_only(type_=dict)
+    def is_valid(self, instance):
+        if self._only_properties(instance):
+            for key, validator in self._validators.items():
+                if key in instance and not validator.is_valid(instance=instance[key]):
+                    return False
+            return True
+        self._key_lookups += len(instance)
+        for key, value in instance.items():
+            validators = self._key_validators.get(key)
+            if validators is None:
+                validators = self._validators_for(key)
+            for validator in validators:
+                if not validator.is_valid(instance=value):
+                    return False
+        return True
+
+    def _checks(self, instance) -> typing.Iterator[typing.Tuple[str, typing.Any, AValidator]]:
+        "the key, value and validator of every check that validate makes, in order"
+        if self._only_properties(instance):
+            for key, validator in self._validators.items():
+                if key in instance:
+                    yield key, instance[key], validator
+            return
+        self._key_lookups += len(instance)
+        for key, value in instance.items():
+            validators = self._key_validators.get(key)
+            if validators is None:
+                validators = self._validators_for(key)
+            for validator in validators:
+                yield key, value, validator
+
+    def _only_properties(self, instance) -> bool:
+        "whether it is quicker to go through the properties in the schema than the keys of the instance"
+        return (
+            not self._pattern_validators
+            and self._additional_validator is None
+            and len(self._validators) < len(instance)
+        )
+
+    def _validators_for(self, key) -> typing.Tuple[AValidator, ...]:
+        "the properties entry and the patternProperties that match the key or else additionalProperties"
+        self._key_misses += 1
+        validators = []
+        if key in self._validators:
+            validators.append(self._validators[key])
+        for regex in self._patterns.matching(key):
+            # the optimizer can drop pattern validators that accept everything
+            if self._pattern_validators.get(regex) is not None:
+                validators.append(self._pattern_validators[regex])
+        if not validators and self._additional_validator:
+            validators.append(self._additional_validator)
+        if len(self._key_validators) >= KEY_CACHE_SIZE:
+            # start again rather than keep the names seen first forever
+            self._key_validators.clear()
+        self._key_validators[key] = tuple(validators)
+        return self._key_validators[key]
+
+    def validators_for(self, key) -> typing.Tuple[AValidator, ...]:
+        self._key_lookups += 1
+        validators = self._key_validators.get(key)
+        if validators is None:
+            return self._validators_for(key)
+        return validators
+
+    def cache_info(self) -> CacheInfo:
+        "every property of an object checked counts, including the ones after is_valid found a failure"
+        return CacheInfo(
+            hits=self._key_lookups - self._key_misses,
+            misses=self._key_misses,
+            maxsize=KEY_CACHE_SIZE,
+            currsize=len(self._key_validators),
+        )
+
     def __repr__(self):
         return f"Property(properties={self._validators}, additionalProperties={self._additional_validator}, patternProperties={self._pattern_validators})"
 
@@ -76,65 +157,37 @@ class _Property(KeywordGroup):
         yield from self._pattern_validators.values()
 
 
-def _validate(
-    property_validators, additional_validator, pattern_validators, instance, location,
-):
-
-    for key in property_validators:
-        if key in instance:
-            result = property_validators[key](
-                instance=instance[key], location=f"{location}/{key}"
-            )
-
-            if not result:
-                yield result
-
-    remaining_properties = set(instance.keys())
-
-    properties_validated_by_pattern = set()
-    for regex in pattern_validators:
-        for key in remaining_properties:
-            if regex.search(key):
-                properties_validated_by_pattern.add(key)
-                result = pattern_validators[regex](
-                    instance=instance[key], location=location
-                )  # this is wrong. should be location/regex fix later
-                if not result:
-                    yield result
-
-    # additionalProperties only applies to properties not in properties or patternProperties
-    additionalProperties = (
-        remaining_properties - properties_validated_by_pattern
-    ) - set(property_validators.keys())
-
-    if additional_validator:
-        for key in additionalProperties:
-            result = additional_validator(
-                instance=instance[key], location=f"{location}/{key}"
-            )
-            if not result:
-                yield result
-
-
 class _Required(Keyword):
     keyword = "required"
+    message = "This instance is missing these required keys: {missing}"
 
     def __init__(self, schema: dict, location, parent):
         super().__init__(schema=schema, location=location, parent=parent)
         required = schema["required"]
         self.value = required
+        self._required = tuple(dict.fromkeys(required))
 
     @validate_only(type_=dict)
     def __call__(self, instance, location):
-        missing = set(self.value) - set(instance.keys())
+        missing = [key for key in self._required if key not in instance]
         if missing:
             return ValidationResult(
-                message=f"This instance is missing these required keys: {missing}",
+                message=self.message,
+                arguments={"missing": missing},
                 location=location,
                 keywordLocation=self.location,
             )
         return True
 
+    @validate_only(type_=dict)
+    def is_valid(self, instance):
+        if len(instance) < len(self._required):
+            return False
+        for key in self._required:
+            if key not in instance:
+                return False
+        return True
+
 
 class _PropertyNames(Keyword):
     keyword = "propertyNames"
@@ -147,11 +200,10 @@ class _PropertyNames(Keyword):
 
     @validate_only(type_=dict)
     def __call__(self, instance, location):
-        results = validate_property_names(
-            validator=self._validator, instance=instance, location=location
+        results = collect_failures(
+            validate_property_names(validator=self._validator, instance=instance, location=location)
         )
-        results = list(results)
-        if all(results):
+        if not results:
             return True
         else:
             return ValidationResult(
@@ -161,13 +213,20 @@ class _PropertyNames(Keyword):
                 sub_results=results,
             )
 
+    @validate_only(type_=dict)
+    def is_valid(self, instance):
+        for propertyName in instance:
+            if not self._validator.is_valid(instance=propertyName):
+                return False
+        return True
+
     def sub_validators(self):
         yield self._validator
 
 
 def validate_property_names(validator, instance, location):
     for propertyName in instance:
-        res = validator(instance=propertyName, location=f"{location}/{propertyName}")
+        res = validator(instance=propertyName, location=(location, propertyName))
 
         if not res:
             yield res
@@ -175,6 +234,7 @@ def validate_property_names(validator, instance, location):
 
 class _MinProperties(Keyword):
     keyword = "minProperties"
+    message = "this {instance} has less than minProperties: {value}"
 
     @validate_only(type_=dict)
     def __call__(self, instance, location):
@@ -183,15 +243,21 @@ class _MinProperties(Keyword):
             True
             if res
             else ValidationResult(
-                message=f"this {instance} has less than minProperties: {self.value}",
+                message=self.message,
+                arguments={"instance": instance, "value": self.value},
                 keywordLocation=self.location,
                 location=location,
             )
         )
 
+    @validate_only(type_=dict)
+    def is_valid(self, instance):
+        return self.value <= len(instance)
+
 
 class _MaxProperties(Keyword):
     keyword = "maxProperties"
+    message = "this {instance} has more than maxProperties: {value}"
 
     @validate_only(type_=dict)
     def __call__(self, instance, location):
@@ -200,34 +266,181 @@ class _MaxProperties(Keyword):
             True
             if res
             else ValidationResult(
-                message=f"this {instance} has more than maxProperties: {self.value}",
+                message=self.message,
+                arguments={"instance": instance, "value": self.value},
                 keywordLocation=self.location,
                 location=location,
             )
         )
 
+    @validate_only(type_=dict)
+    def is_valid(self, instance):
+        return len(instance) <= self.value
+
 
 class _DependentRequired(Keyword):
     keyword = "dependentRequired"
+    message = "{prop!r} is present so these keys are required: {missing}"
 
     @validate_only(type_=dict)
     def __call__(self, instance, location):
-        results = []
-        for prop, dependentProperties in self.value.items():
-            if prop in instance:
-                if not (set(dependentProperties) < set(instance.keys())):
-                    # need to fill in the message
-                    results.append(
-                        ValidationResult(
-                            message="", location=location, keywordLocation=self.location
-                        )
-                    )
-
-        # need to fill in message
-        return (
-            True
-            if not results
-            else ValidationResult(
-                message="", keywordLocation=self.location, location=location
-            )
+        results = collect_failures(self._failures(instance, location))
+        if not results:
+            return True
+        return ValidationResult(
+            message="This instance is missing keys that are dependent on the keys present",
+            keywordLocation=self.location,
+            location=location,
+            sub_results=results,
         )
+
+    @validate_only(type_=dict)
+    def is_valid(self, instance):
+        for prop in self._present(instance):
+            for key in self.value[prop]:
+                if key not in instance:
+                    return False
+        return True
+
+    def _failures(self, instance, location) -> typing.Iterator[ValidationResult]:
+        # in the order of the schema, like the generated code
+        for prop, dependencies in self.value.items():
+            missing = [key for key in dependencies if key not in instance] if prop in instance else None
+            if missing:
+                yield ValidationResult(
+                    message=self.message,
+                    arguments={"prop": prop, "missing": missing},
+                    location=location,
+                    keywordLocation=f"{self.location}/{prop}",
+                )
+
+    def _present(self, instance) -> typing.Iterator[str]:
+        "the keys of dependentRequired in the instance - going through whichever of the two is smaller"
+        if len(self.value) <= len(instance):
+            return (prop for prop in self.value if prop in instance)
+        return (key for key in instance if key in self.value)
+
+
+class Shape(typing.NamedTuple):
+    "what is known about every object with the same keys in the same order"
+    # propertyNames, required, dependentRequired, minProperties and maxProperties only depend on the keys
+    keys_valid: bool
+    # the validators for the value of each key, in the order of the keys
+    routes: typing.Tuple[typing.Tuple[AValidator, ...], ...]
+
+
+class _Object(KeywordGroup):
+    """
+    properties, patternProperties, additionalProperties, propertyNames, required, dependentRequired, minProperties and
+    maxProperties in one validator.
+    Everything but the validation of the values depends only on the keys of the object so it is worked out once
+    for each shape - the tuple of keys - and kept in a bounded cache. Objects that share a shape are then checked
+    with one dictionary lookup and a pass over their values.
+    """
+
+    def __init__(self, schema: dict, location, parent):
+        super().__init__(schema=schema, location=location, parent=parent)
+        vocabularies = VOCABULARIES.get()
+        built: typing.Set[type] = set()
+        self._keywords: typing.List[AValidator] = []
+        for key, KeywordClass in OBJECT_KEYWORDS.items():
+            if key in schema and vocabularies.get(key) is _Object and KeywordClass not in built:
+                built.add(KeywordClass)
+                self._keywords.append(KeywordClass(schema=schema, location=location, parent=parent))
+        self._shapes: typing.Dict[typing.Tuple[str, ...], Shape] = {}
+        self._shape_lookups = 0
+        self._shape_misses = 0
+
+    @property
+    def _property(self) -> typing.Optional[_Property]:
+        return next((keyword for keyword in self._keywords if isinstance(keyword, _Property)), None)
+
+    @validate_only(type_=dict)
+    def __call__(self, instance, location):
+        if self.is_valid(instance=instance):
+            return True
+        results = collect_failures(keyword(instance=instance, location=location) for keyword in self._keywords)
+        if len(results) == 1:
+            return results[0]
+        return ValidationResult(
+            message="",
+            location=location,
+            keywordLocation="",  # since this is a virtual keyword
+            sub_results=results,
+        )
+
+    @validate_only(type_=dict)
+    def is_valid(self, instance):
+        if len(instance) > SHAPE_MAX_KEYS:
+            # a map rather than a record - each keyword goes through whichever is smaller of it and the instance
+            for keyword in self._keywords:
+                if not keyword.is_valid(instance=instance):
+                    return False
+            return True
+        keys_valid, routes = self._shape(instance)
+        if not keys_valid:
+            return False
+        for value, validators in zip(instance.values(), routes):
+            for validator in validators:
+                if not validator.is_valid(instance=value):
+                    return False
+        return True
+
+    def _shape(self, instance: dict) -> Shape:
+        keys = tuple(instance)
+        self._shape_lookups += 1
+        shape = self._shapes.get(keys)
+        if shape is None:
+            self._shape_misses += 1
+            shape = self._plan(instance)
+            if len(self._shapes) >= SHAPE_CACHE_SIZE:
+                # start again rather than keep the shapes seen first forever
+                self._shapes.clear()
+            self._shapes[keys] = shape
+        return shape
+
+    def _plan(self, instance: dict) -> Shape:
+        property_ = names = None
+        keys_valid = True
+        for keyword in self._keywords:
+            if isinstance(keyword, _Property):
+                property_ = keyword
+            elif isinstance(keyword, _PropertyNames):
+                names = keyword._validator
+            elif keys_valid:
+                keys_valid = keyword.is_valid(instance=instance)
+        # one pass over the keys for both propertyNames and the validators of the values
+        routes = []
+        for key in instance:
+            if names is not None and keys_valid and not names.is_valid(instance=key):
+                keys_valid = False
+            if property_ is not None:
+                routes.append(property_.validators_for(key))
+        return Shape(keys_valid=keys_valid, routes=tuple(routes))
+
+    def cache_info(self) -> CacheInfo:
+        "objects with more than SHAPE_MAX_KEYS keys aren't cached and aren't counted"
+        return CacheInfo(
+            hits=self._shape_lookups - self._shape_misses,
+            misses=self._shape_misses,
+            maxsize=SHAPE_CACHE_SIZE,
+            currsize=len(self._shapes),
+        )
+
+    def sub_validators(self):
+        yield from self._keywords
+
+    def __repr__(self):
+        return f"Object({self._keywords})"
+
+
+OBJECT_KEYWORDS: typing.Dict[str, type] = {
+    "properties": _Property,
+    "patternProperties": _Property,
+    "additionalProperties": _Property,
+    "required": _Required,
+    "dependentRequired": _DependentRequired,
+    "minProperties": _MinProperties,
+    "maxProperties": _MaxProperties,
+    "propertyNames": _PropertyNames,
+}
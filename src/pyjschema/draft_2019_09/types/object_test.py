@@ -0,0 +1,99 @@
+import unittest
+
+import parameterized  # type: ignore
+
+from pyjschema.draft_2019_09.validator_construction import construct_validator
+
+from ..testing import build
+from .object_ import SHAPE_MAX_KEYS, _Object
+
+
+def object_keywords(validator) -> _Object:
+    return next(keyword for keyword in validator._validators.values() if isinstance(keyword, _Object))
+
+
+class TestPropertyKeyCache(unittest.TestCase):
+    def test(self):
+        validator = build(
+            {
+                "properties": {"x-id": {"type": "integer"}},
+                "patternProperties": {"^x-": {"minimum": 0}},
+                "additionalProperties": {"type": "string"},
+            }
+        )
+        properties = object_keywords(validator)._property
+        self.assertTrue(validator.is_valid({"x-id": 1, "x-other": 2, "name": "a"}))
+        self.assertTrue(validator.is_valid({"x-id": 3, "x-other": 4, "name": "b"}))
+        self.assertFalse(validator.is_valid({"x-id": -1}))
+        self.assertFalse(validator.is_valid({"name": 1}))
+        self.assertEqual(
+            properties._key_validators["x-id"],
+            (properties._validators["x-id"], *properties._pattern_validators.values()),
+        )
+        self.assertEqual(properties._key_validators["name"], (properties._additional_validator,))
+        self.assertEqual(tuple(properties.cache_info()), (2, 3, 1024, 3))
+
+
+class TestObjectShapeCache(unittest.TestCase):
+    schema = {
+        "properties": {"id": {"type": "integer"}, "name": {"type": "string"}},
+        "required": ["id"],
+        "dependentRequired": {"name": ["id"]},
+        "maxProperties": 3,
+    }
+
+    def test(self):
+        validator = build(self.schema)
+        keywords = object_keywords(validator)
+        self.assertTrue(validator.is_valid({"id": 1, "name": "a"}))
+        self.assertTrue(validator.is_valid({"id": 2, "name": "b"}))
+        self.assertFalse(validator.is_valid({"id": 3, "name": 4}))
+        self.assertFalse(validator.is_valid({"name": "c"}))
+        self.assertFalse(validator.is_valid({"name": "d"}))
+        self.assertEqual(tuple(keywords.cache_info()), (3, 2, 256, 2))
+        self.assertFalse(keywords._shapes[("name",)].keys_valid)
+        self.assertEqual(
+            keywords._shapes[("id", "name")].routes,
+            ((keywords._property._validators["id"],), (keywords._property._validators["name"],)),
+        )
+
+    def test_validate(self):
+        validator = build(self.schema)
+        self.assertTrue(validator({"id": 1, "name": "a"}, location=""))
+        result = validator({"name": 1}, location="")
+        self.assertFalse(result)
+        self.assertEqual(
+            sorted(sub_result.keywordLocation for sub_result in result.sub_results[0].sub_results),
+            ["", "/dependentRequired", "/required"],
+        )
+
+    def test_maps_are_not_cached(self):
+        validator = build({"additionalProperties": {"type": "integer"}})
+        keywords = object_keywords(validator)
+        instance = {str(i): i for i in range(SHAPE_MAX_KEYS + 1)}
+        self.assertTrue(validator.is_valid(instance))
+        instance["0"] = "0"
+        self.assertFalse(validator.is_valid(instance))
+        self.assertEqual(keywords._shapes, {})
+
+
+class TestObjectKeywords(unittest.TestCase):
+    @parameterized.parameterized.expand(
+        [
+            ("dependency on itself", {"dependentRequired": {"a": ["a"]}}, {"a": 1}, True),
+            ("dependency on every key", {"dependentRequired": {"a": ["b"]}}, {"a": 1, "b": 2}, True),
+            ("missing dependency", {"dependentRequired": {"a": ["b"]}}, {"a": 1, "c": 2}, False),
+            ("more dependencies than keys", {"dependentRequired": {k: ["a"] for k in "bcdef"}}, {"b": 1}, False),
+            ("fewer keys than required", {"required": ["a", "b"]}, {"a": 1}, False),
+            ("required repeated", {"required": ["a", "a"]}, {"a": 1}, True),
+            ("property name", {"propertyNames": {"maxLength": 1}}, {"a": 1, "bc": 2}, False),
+            ("properties of a map", {"properties": {"a": {"type": "string"}}}, {str(i): i for i in range(100)}, True),
+            ("property of a map", {"properties": {"1": {"type": "string"}}}, {str(i): i for i in range(100)}, False),
+        ]
+    )
+    def test(self, _, schema, instance, expected):
+        validator = build(schema)
+        self.assertEqual(validator.is_valid(instance), expected)
+        self.assertEqual(bool(validator(instance, location="")), expected)
+        validate = construct_validator(schema, mode="codegen")
+        self.assertEqual(bool(validate(instance)), expected)
@@ -4,49 +4,90 @@ from pyjschema.utils import ValidationResult
 
 class Const(Keyword):
     keyword = "const"
+    message = "{instance!r} is not equal to the constant {value!r}"
+
+    def __init__(self, schema, location, parent):
+        super().__init__(schema=schema, location=location, parent=parent)
+        self._canonical = canonical(self.value)
 
     def __call__(self, instance, location):
-        ok = equals(self.value, instance)
         return (
             True
-            if ok
+            if self.is_valid(instance)
             else ValidationResult(
-                message=f"{instance!r} is not equal to the constant {self.value!r}",
+                message=self.message,
+                arguments={"instance": instance, "value": self.value},
                 location=location,
                 keywordLocation=self.location,
             )
         )
 
+    def is_valid(self, instance):
+        if isinstance(instance, (dict, list)) and not isinstance(self.value, type(instance)):
+            # saves working out the canonical form of an object or array that can't be equal
+            return False
+        return canonical(instance) == self._canonical
+
 
 class Enum(Keyword):
     keyword = "enum"
+    message = "{instance!r} is not one of the values in this enum {value!r}"
+
+    def __init__(self, schema, location, parent):
+        super().__init__(schema=schema, location=location, parent=parent)
+        self._canonical = frozenset(canonical(value) for value in self.value)
 
     def __call__(self, instance, location):
-        for value in self.value:
-            if equals(value, instance):
-                return True
+        if self.is_valid(instance):
+            return True
         return ValidationResult(
-            message=f"{instance!r} is not one of the values in this enum {self.value!r}",
+            message=self.message,
+            arguments={"instance": instance, "value": self.value},
             location=location,
             keywordLocation=self.location,
         )
 
+    def is_valid(self, instance):
+        return canonical(instance) in self._canonical
 
-def equals(a, b):
-    # these special rules are required because bool is a number and that messes up the
-    # type checks
-    if isinstance(a, bool) and isinstance(b, bool):
-        return a is b
-    if isinstance(a, bool) and isinstance(b, (int, float)):
-        return False
-    if isinstance(b, bool) and isinstance(a, (int, float)):
-        return False
 
-    if a == b:
-        return True
-    else:
-        # TODO I should add message
-        return False
+class _Boolean:
+    "stands in for true and false in canonical values, True == 1 in python but not in JSON"
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return f"_Boolean({self.value})"
+
+
+TRUE = _Boolean(True)
+FALSE = _Boolean(False)
+# values of these types are their own canonical form, checked first since they are most of the values
+PLAIN = frozenset([str, int, float, type(None)])
+
+
+def canonical(value):
+    """
+    A hashable value that is equal for JSON values that are equal and different for the ones that are not.
+    Booleans are different from numbers, 1 and 1.0 are equal, objects don't depend on the order of their keys
+    and arrays and objects can be nested.
+    """
+    if value is True:
+        return TRUE
+    if value is False:
+        return FALSE
+    if isinstance(value, list):
+        return tuple([item if type(item) in PLAIN else canonical(item) for item in value])
+    if isinstance(value, dict):
+        return frozenset(
+            [(key, item if type(item) in PLAIN else canonical(item)) for key, item in value.items()]
+        )
+    return value
+
+
+def equals(a, b):
+    return canonical(a) == canonical(b)
 
 
 class AcceptAll(AValidator):
@@ -56,6 +97,9 @@ class AcceptAll(AValidator):
     def __call__(self, instance, location):
         return True
 
+    def is_valid(self, instance):
+        return True
+
     def __repr__(self):
         return "AcceptAll()"
 
@@ -71,5 +115,8 @@ class RejectAll(AValidator):
             keywordLocation=self.location,
         )
 
+    def is_valid(self, instance):
+        return False
+
     def __repr__(self):
         return "RejectAll()"
@@ -1,6 +1,8 @@
 import unittest
 
-from .primitives import AcceptAll, Const, Enum, RejectAll
+import parameterized  # type: ignore
+
+from .primitives import AcceptAll, Const, Enum, RejectAll, canonical
 
 from pyjschema.utils import OUTPUT
 
@@ -39,3 +41,28 @@ class TestEnum(unittest.TestCase):
     def test_const_false(self):
         validator = Enum(schema={"enum": [12434]}, location="", parent=None)
         assert not validator(instance="astring", location="")
+
+
+class TestCanonical(unittest.TestCase):
+    @parameterized.parameterized.expand(
+        [
+            ("int and float", 1, 1.0, True),
+            ("bool and int", True, 1, False),
+            ("false and zero", False, 0, False),
+            ("nested bool and int", [{"a": True}], [{"a": 1}], False),
+            ("key order", {"a": 1, "b": [2]}, {"b": [2], "a": 1}, True),
+            ("array and object", [], {}, False),
+            ("number and string", 1, "1", False),
+        ]
+    )
+    def test(self, description, a, b, equal):
+        self.assertEqual(canonical(a) == canonical(b), equal)
+
+    def test_enum(self):
+        validator = Enum(
+            schema={"enum": [1, {"a": [True]}, "x"]}, location="", parent=None
+        )
+        self.assertTrue(validator.is_valid(1.0))
+        self.assertTrue(validator.is_valid({"a": [True]}))
+        self.assertFalse(validator.is_valid(True))
+        self.assertFalse(validator.is_valid({"a": [1]}))
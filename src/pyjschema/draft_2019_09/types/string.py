@@ -1,9 +1,18 @@
-from pyjschema.common import Keyword
-from pyjschema.utils import validate_only, ValidationResult
+import typing
+
+from pyjschema.common import AValidator, Keyword, KeywordGroup
+from pyjschema.draft_2019_09.context import VOCABULARIES
+from pyjschema.utils import collect_failures, compile_regex, validate_only, ValidationResult
+
+from .primitives import Const, Enum
+from .type_ import Type
+
+INFINITY = float("inf")
 
 
 class _MaxLength(Keyword):
     keyword = "maxLength"
+    message = "{instance!r}'s length is more than max_length: {value!r}"
 
     @validate_only(type_=str)
     def __call__(self, instance, location):
@@ -12,15 +21,21 @@ class _MaxLength(Keyword):
             True
             if res
             else ValidationResult(
-                message=f"{instance!r}'s length is more than max_length: {self.value!r}",
+                message=self.message,
+                arguments={"instance": instance, "value": self.value},
                 keywordLocation=self.location,
                 location=location,
             )
         )
 
+    @validate_only(type_=str)
+    def is_valid(self, instance):
+        return len(instance) <= self.value
+
 
 class _MinLength(Keyword):
     keyword = "minLength"
+    message = "{instance!r}'s length is less than min_length: {value!r}"
 
     @validate_only(type_=str)
     def __call__(self, instance, location):
@@ -29,28 +44,123 @@ class _MinLength(Keyword):
             True
             if res
             else ValidationResult(
-                message=f"{instance!r}'s length is less than min_length: {self.value!r}",
+                message=self.message,
+                arguments={"instance": instance, "value": self.value},
                 keywordLocation=self.location,
                 location=location,
             )
         )
 
+    @validate_only(type_=str)
+    def is_valid(self, instance):
+        return self.value <= len(instance)
+
 
 class _Pattern(Keyword):
     keyword = "pattern"
+    message = "{instance!r} doesnt match this pattern: {value!r}"
 
     def __init__(self, schema: dict, location, parent):
         super().__init__(schema=schema, location=location, parent=parent)
-        import re
-
-        self.regex = re.compile(pattern=self.value)
+        self.regex = compile_regex(self.value)
 
     @validate_only(type_=str)
     def __call__(self, instance, location):
         if not self.regex.search(instance):
             return ValidationResult(
-                message=f"{instance!r} doesnt match this pattern: {self.value!r}",
+                message=self.message,
+                arguments={"instance": instance, "value": self.value},
                 location=location,
                 keywordLocation=self.location,
             )
         return True
+
+    @validate_only(type_=str)
+    def is_valid(self, instance):
+        return bool(self.regex.search(instance))
+
+
+class _String(KeywordGroup):
+    """
+    minLength, maxLength and pattern in one validator - along with type, const and enum when the type is only string.
+    The type is checked once, then the length, then const and enum and the regex last so that it never runs on a
+    string that the cheaper checks reject.
+    When the values are known from const or enum the ones that don't pass the other keywords are filtered out when
+    the schema is built, which leaves a single set lookup.
+    """
+
+    def __init__(self, schema: dict, location, parent):
+        super().__init__(schema=schema, location=location, parent=parent)
+        vocabularies = VOCABULARIES.get()
+        self._keywords: typing.List[AValidator] = [
+            KeywordClass(schema=schema, location=location, parent=parent)
+            for key, KeywordClass in STRING_KEYWORDS.items()
+            if key in schema and vocabularies.get(key) is _String
+        ]
+        self._type: typing.Optional[Type] = None
+        self._shortest = schema.get("minLength", 0) if vocabularies.get("minLength") is _String else 0
+        self._longest = schema.get("maxLength", INFINITY) if vocabularies.get("maxLength") is _String else INFINITY
+        self._regex = next((keyword.regex for keyword in self._keywords if isinstance(keyword, _Pattern)), None)
+        # the strings that are allowed when there is a const or enum, None when any string could be
+        self._allowed: typing.Optional[typing.FrozenSet[str]] = None
+
+    def absorb(self, validators):
+        type_ = validators.get("type")
+        if not (isinstance(type_, Type) and type_._types == ["string"]):
+            return ()
+        self._type = type_
+        absorbed = ["type"]
+        for key, KeywordClass in [("const", Const), ("enum", Enum)]:
+            keyword = validators.get(key)
+            if isinstance(keyword, KeywordClass):
+                values = [keyword.value] if key == "const" else keyword.value
+                allowed = frozenset(value for value in values if isinstance(value, str))
+                self._allowed = allowed if self._allowed is None else self._allowed & allowed
+                absorbed.append(key)
+        if self._allowed is not None:
+            self._allowed = frozenset(value for value in self._allowed if self._passes(value))
+        # in the order they are checked in
+        lengths = [keyword for keyword in self._keywords if not isinstance(keyword, _Pattern)]
+        patterns = [keyword for keyword in self._keywords if isinstance(keyword, _Pattern)]
+        self._keywords = [type_] + lengths + [validators[key] for key in absorbed[1:]] + patterns
+        return absorbed
+
+    def __call__(self, instance, location):
+        if self.is_valid(instance=instance):
+            return True
+        results = collect_failures(keyword(instance=instance, location=location) for keyword in self._keywords)
+        if len(results) == 1:
+            return results[0]
+        return ValidationResult(
+            message="",
+            location=location,
+            keywordLocation="",  # since this is a virtual keyword
+            sub_results=results,
+        )
+
+    def is_valid(self, instance):
+        if not isinstance(instance, str):
+            # string keywords don't apply to other types
+            return self._type is None
+        if self._allowed is not None:
+            return instance in self._allowed
+        return self._passes(instance)
+
+    def _passes(self, string: str) -> bool:
+        "whether the string passes minLength, maxLength and pattern"
+        if not self._shortest <= len(string) <= self._longest:
+            return False
+        return self._regex is None or bool(self._regex.search(string))
+
+    def sub_validators(self):
+        yield from self._keywords
+
+    def __repr__(self):
+        return f"String({self._keywords})"
+
+
+STRING_KEYWORDS: typing.Dict[str, type] = {
+    "minLength": _MinLength,
+    "maxLength": _MaxLength,
+    "pattern": _Pattern,
+}
@@ -0,0 +1,73 @@
+import unittest
+
+import parameterized  # type: ignore
+
+from pyjschema.draft_2019_09.validator_construction import construct_validator
+
+from ..testing import build
+from .string import _String
+
+
+class TestString(unittest.TestCase):
+    @parameterized.parameterized.expand(
+        [
+            ("too short", {"type": "string", "minLength": 2}, "a", False),
+            ("too long", {"type": "string", "maxLength": 2, "pattern": "^a"}, "abc", False),
+            ("pattern", {"type": "string", "pattern": "^a"}, "ba", False),
+            ("not a string", {"type": "string", "pattern": "^a"}, 1, False),
+            ("no type", {"pattern": "^a"}, 1, True),
+            ("other types", {"type": ["string", "integer"], "pattern": "^a"}, 1, True),
+            ("enum", {"type": "string", "maxLength": 3, "enum": ["abc", "abcd", 1]}, "abc", True),
+            ("enum too long", {"type": "string", "maxLength": 3, "enum": ["abc", "abcd", 1]}, "abcd", False),
+            ("enum other type", {"type": "string", "maxLength": 3, "enum": ["abc", "abcd", 1]}, 1, False),
+            ("const", {"type": "string", "pattern": "b", "const": "abc"}, "abc", True),
+            ("const and enum", {"type": "string", "minLength": 1, "const": "a", "enum": ["b"]}, "a", False),
+        ]
+    )
+    def test(self, _, schema, instance, expected):
+        for mode in ["interpreted", "codegen"]:
+            with self.subTest(mode):
+                validate = construct_validator(schema, mode=mode)
+                self.assertEqual(validate.is_valid(instance), expected)
+                self.assertEqual(bool(validate(instance)), expected)
+
+    def test_absorbs_type_enum_and_const(self):
+        validator = build({"type": "string", "maxLength": 3, "pattern": "^a", "enum": ["a", "abcd", "b", 1]})
+        self.assertEqual(list(validator._validators), ["maxLength"])
+        string = validator._validators["maxLength"]
+        self.assertIsInstance(string, _String)
+        self.assertEqual(string._allowed, frozenset(["a"]))
+        self.assertEqual(
+            [keyword.location for keyword in string._keywords], ["/type", "/maxLength", "/enum", "/pattern"]
+        )
+
+    def test_other_types_kept(self):
+        validator = build({"type": ["string", "null"], "maxLength": 3, "enum": ["a", None]})
+        self.assertEqual(sorted(validator._validators), ["enum", "maxLength", "type"])
+
+    def test_length_before_pattern(self):
+        validator = build({"type": "string", "maxLength": 3, "pattern": "^(a|b)*c$"})
+        string = validator._validators["maxLength"]
+        searched: list = []
+        string._regex = _Recorder(string._regex, searched)
+        self.assertFalse(validator.is_valid("abababc"))
+        self.assertTrue(validator.is_valid("abc"))
+        self.assertEqual(searched, ["abc"])
+
+    def test_error(self):
+        validate = construct_validator({"type": "string", "maxLength": 1, "pattern": "^a"})
+        result = validate("bb")
+        self.assertEqual(
+            sorted(sub_result.keywordLocation for sub_result in result.sub_results[0].sub_results),
+            ["/maxLength", "/pattern"],
+        )
+
+
+class _Recorder:
+    def __init__(self, regex, searched):
+        self._regex = regex
+        self._searched = searched
+
+    def search(self, string):
+        self._searched.append(string)
+        return self._regex.search(string)
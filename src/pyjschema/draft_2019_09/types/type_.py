@@ -18,6 +18,7 @@ class Type(Keyword):
     """Validator for a type"""
 
     keyword = "type"
+    message = "{instance!r} is not a {value}"
 
     def __init__(self, schema, location, parent):
         super().__init__(schema=schema, location=location, parent=parent)
@@ -31,11 +32,18 @@ class Type(Keyword):
             if isinstance_(instance, NAME_TO_TYPE[type_]):
                 return True
         return ValidationResult(
-            message=f"{instance!r} is not a {self.value}",
+            message=self.message,
+            arguments={"instance": instance, "value": self.value},
             location=location,
             keywordLocation=self.location,
         )
 
+    def is_valid(self, instance):
+        for type_ in self._types:
+            if isinstance_(instance, NAME_TO_TYPE[type_]):
+                return True
+        return False
+
     def __repr__(self):
         return f"Type({self._types})"
 
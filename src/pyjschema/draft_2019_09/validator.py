@@ -1,9 +1,9 @@
 import typing
 
-from pyjschema.common import AValidator
+from pyjschema.common import AValidator, KeywordGroup
 from pyjschema.draft_2019_09.context import VOCABULARIES
 from pyjschema.exceptions import SchemaError
-from pyjschema.utils import ValidationResult
+from pyjschema.utils import collect_failures, ValidationResult
 
 KEYWORDS_THAT_REQUIRE_ANNOTATION_COLLECTION = set(
     ["unevaluatedProperties", "unevaluatedItems"]
@@ -26,6 +26,8 @@ class Validator(AValidator):
                 f" - which is required for these keywords - {unsupported_keywords} present in the schema"
             )
         self._validators: typing.Dict[str, AValidator] = dict()
+        self._validators_by_type: typing.Dict[type, typing.Tuple] = {}
+        self._is_valid_by_type: typing.Dict[type, typing.Tuple] = {}
 
         self.recursiveAnchor = schema.get("$recursiveAnchor", False)
 
@@ -33,18 +35,27 @@ class Validator(AValidator):
             self.anchor = "#" + schema["$anchor"]
 
         KEYWORD_TO_VALIDATOR = VOCABULARIES.get()
+        built: typing.Set[type] = set()
 
         for key, KeywordClass in KEYWORD_TO_VALIDATOR.items():
-            if key in schema:
+            # a KeywordGroup is registered for every keyword in its group but only needs to be built once
+            if key in schema and KeywordClass not in built:
+                built.add(KeywordClass)
                 self._validators[key] = KeywordClass(
                     schema=schema, location=location, parent=self
                 )
+        for keyword in list(self._validators.values()):
+            if isinstance(keyword, KeywordGroup):
+                for key in list(keyword.absorb(self._validators)):
+                    del self._validators[key]
 
     def __call__(self, instance, location):
-        results = validate_instance_against_all_validators(
-            validators=self._validators, instance=instance, location=location
+        validators = self._validators_by_type.get(type(instance))
+        if validators is None:
+            validators = self._dispatch(type(instance))
+        results = collect_failures(
+            validator(instance=instance, location=location) for validator in validators
         )
-        results = list(results)
         if not results:
             return True
         else:
@@ -55,6 +66,30 @@ class Validator(AValidator):
                 sub_results=results,
             )
 
+    def is_valid(self, instance):
+        validators = self._is_valid_by_type.get(type(instance))
+        if validators is None:
+            self._dispatch(type(instance))
+            validators = self._is_valid_by_type[type(instance)]
+        for is_valid in validators:
+            if not is_valid(instance=instance):
+                return False
+        return True
+
+    def _dispatch(self, type_):
+        """
+        Works out the keywords that apply to instances of this type.
+        This is done once per type so that every call afterwards is a single dictionary lookup
+        instead of calling every keyword and letting the ones for other types return True.
+        """
+        self._validators_by_type[type_] = _applicable(
+            (validator.__call__ for validator in self._validators.values()), type_
+        )
+        self._is_valid_by_type[type_] = _applicable(
+            (validator.is_valid for validator in self._validators.values()), type_
+        )
+        return self._validators_by_type[type_]
+
     def sub_validators(self):
         yield from self._validators.values()
 
@@ -62,20 +97,13 @@ class Validator(AValidator):
         return f"Validator(validators={self._validators})"
 
 
-def validate_instance_against_all_validators(
-    validators: typing.Dict[str, AValidator], instance, location
-):
-    results: typing.Iterable
-    # if USE_SHORTCIRCUITING.get():
-    #     results = (
-    #         validator(instance=instance, location=location)
-    #         for key, validator in validators.items()
-    #     )
-    # else:
-    results = [
-        validator(instance=instance, location=location)
-        for key, validator in validators.items()
-    ]
-    yield from filter(
-        lambda res: not res, results,
-    )
+def _applicable(methods, type_) -> typing.Tuple[typing.Callable, ...]:
+    applicable = []
+    for method in methods:
+        applies_to = getattr(method, "type_", None)
+        if applies_to is None:
+            applicable.append(method)
+        elif issubclass(type_, applies_to):
+            # skip validate_only's isinstance check since we already know the type
+            applicable.append(method.__wrapped__.__get__(method.__self__))
+    return tuple(applicable)
@@ -2,9 +2,13 @@ import json
 import os
 import typing
 from pyjschema.exceptions import SchemaError, ValidationError
+from pyjschema.utils import ERROR_BUDGET, ErrorBudget, context
 
-from .context import BUILD_VALIDATOR, VOCABULARIES
-from .referencing import resolve_references
+from .codegen import compile_validator
+from .context import BUILD_VALIDATOR, BUILT_SUBSCHEMAS, VOCABULARIES
+from .optimizer import optimize as optimize_validator
+from .referencing import inline_references, resolve_references
+from .sharing import SharedSubschemas
 from .types import AcceptAll, RejectAll
 from .validator import Validator
 from .vocabularies import METASCHEMA_VALIDATORS, get_vocabularies
@@ -12,23 +16,85 @@ from .vocabularies import METASCHEMA_VALIDATORS, get_vocabularies
 __all__ = ["validate", "Validator", "construct_validator"]
 
 
-def construct_validator(schema, check_schema=False):
+MODES = ("interpreted", "codegen")
+
+
+def construct_validator(
+    schema,
+    check_schema=False,
+    mode="interpreted",
+    two_phase=False,
+    optimize=False,
+    max_errors=None,
+    share_subschemas=False,
+):
+    """
+    Returns a validate function. validate.is_valid(instance) only answers whether the instance is valid
+    and stops at the first failure so it is cheaper than validate when the details aren't needed.
+
+    mode is either "interpreted" - the validator tree is walked for every instance - or "codegen"
+    where a python function is generated for every subschema. The codegen validate function stops at and returns
+    the first failure it finds instead of the full tree of results.
+
+    With two_phase=True, validate first runs is_valid and only walks the validator tree to build the
+    ValidationResults when that fails - so valid instances, the common case, don't pay for them.
+    The results for invalid instances are the same as the interpreted mode.
+
+    With optimize=True, redundant parts of the schema e.g an allOf with one subschema or unreachable $defs are
+    simplified away before validating anything. validate.optimizations lists what was changed.
+
+    With share_subschemas=True, identical subschemas are built once and share a validator, which makes building
+    schemas that repeat the same subschema many times much quicker. A failure in a shared subschema reports the
+    keywordLocation of the first place it appears.
+
+    With max_errors=N validate stops once N errors are found and returns the results collected up to then.
+    The codegen validate function stops at the first error anyway.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode!r}, mode should be one of {MODES}")
+    if max_errors is not None and max_errors < 1:
+        raise ValueError(f"max_errors should be at least 1, not {max_errors!r}")
     if check_schema:
         schema_validator = meta_schema_validator(schema=schema)
         # Need to wrap schema errors here and reraisr as SchemaErrors
         if not schema_validator(instance=schema):
             raise SchemaError(message="Schema is invalid according to the meta-schema")
     else:
+        optimizations: typing.List[str] = []
         validator = build_validator_and_resolve_references(
             schema=schema,
             vocabularies=get_vocabularies(schema=schema),
             uri_to_validator={},
+            optimizations=optimizations if optimize else None,
+            share_subschemas=share_subschemas,
         )
+        if mode == "codegen":
+            validate, is_valid = compile_validator(validator)
+            if not two_phase:
+                validate.is_valid = is_valid
+                validate.optimizations = optimizations
+                return validate
+        else:
+            is_valid = validator.is_valid
 
-        def validate(instance):
-            # USE_SHORTCIRCUITING.set(True)
-            return validator(instance=instance, location="/")
+        def validate_all(instance):
+            if max_errors is None:
+                return validator(instance=instance, location="")
+            with context(ERROR_BUDGET, ErrorBudget(max_errors)):
+                return validator(instance=instance, location="")
+
+        if two_phase:
+
+            def validate(instance):
+                if is_valid(instance):
+                    return True
+                return validate_all(instance)
+
+        else:
+            validate = validate_all
 
+        validate.is_valid = is_valid
+        validate.optimizations = optimizations
         return validate
 
 
@@ -67,12 +133,24 @@ def meta_schema_validator(schema):
 BuildValidatorResultType = typing.Union[AcceptAll, RejectAll, Validator]
 
 
-def build_validator_and_resolve_references(schema, vocabularies, uri_to_validator):
+def build_validator_and_resolve_references(
+    schema, vocabularies, uri_to_validator, optimizations=None, share_subschemas=False
+):
+    """
+    When optimizations is a list, the validator tree is simplified before the references are resolved and
+    a description of every rewrite is appended to it.
+    With share_subschemas=True identical subschemas share one validator, see sharing.py
+    """
     # challenge here is that contextvars is only supported by python 3.7 upwards
     VOCABULARIES.set(vocabularies)
     BUILD_VALIDATOR.set(build_validator)
+    BUILT_SUBSCHEMAS.set(SharedSubschemas() if share_subschemas else None)
     validator = build_validator(schema=schema, location="", parent=None)
+    if optimizations is not None:
+        validator, report = optimize_validator(validator)
+        optimizations.extend(report)
     resolve_references(root_validator=validator, uri_to_validator=uri_to_validator)
+    inline_references(root_validator=validator)
     return validator
 
 
@@ -81,7 +159,18 @@ def build_validator(
 ) -> BuildValidatorResultType:
     if isinstance(schema, dict):
         if schema.items():
-            return Validator(schema=schema, location=location, parent=parent)
+            built_subschemas = BUILT_SUBSCHEMAS.get(None)
+            if built_subschemas is None or parent is None:
+                return Validator(schema=schema, location=location, parent=parent)
+            validator = built_subschemas.get(schema, base_uri=parent.base_uri)
+            if validator is not None:
+                # an identical subschema was built already, the other location is kept so that
+                # references to this location still resolve
+                validator.aliases += (location,)
+                return validator
+            validator = Validator(schema=schema, location=location, parent=parent)
+            built_subschemas.add(schema, base_uri=parent.base_uri, validator=validator)
+            return validator
         else:
             return AcceptAll(schema=schema, location=location, parent=parent)
     elif isinstance(schema, (bool,)):
@@ -13,3 +13,71 @@ class Test(unittest.TestCase):
     def test_schema_not_bool_or_dict(self):
         with self.assertRaises(SchemaError):
             construct_validator(["not a valid schema"])
+
+
+class TestIsValid(unittest.TestCase):
+    def test(self):
+        validate = construct_validator(
+            {"type": "array", "items": {"type": "string"}, "maxItems": 2}
+        )
+        self.assertIs(validate.is_valid(["a", "b"]), True)
+        self.assertIs(validate.is_valid(["a", 1]), False)
+        self.assertIs(validate.is_valid(["a", "b", "c"]), False)
+
+
+class TestTwoPhase(unittest.TestCase):
+    def test(self):
+        schema = {"type": "object", "properties": {"a": {"maximum": 5}}}
+        for mode in ["interpreted", "codegen"]:
+            with self.subTest(mode=mode):
+                validate = construct_validator(schema, mode=mode, two_phase=True)
+                self.assertIs(validate({"a": 4}), True)
+                self.assertEqual(
+                    validate({"a": 6}), construct_validator(schema)({"a": 6})
+                )
+
+
+def errors(result):
+    if not result.sub_results:
+        return [result]
+    return [error for sub_result in result.sub_results for error in errors(sub_result)]
+
+
+class TestMaxErrors(unittest.TestCase):
+    schema = {
+        "type": "object",
+        "properties": {
+            "items": {"type": "array", "items": {"type": "string"}},
+            "name": {"type": "string"},
+        },
+    }
+
+    def test(self):
+        instance = {"items": list(range(1000)), "name": 1}
+        self.assertEqual(len(errors(construct_validator(self.schema)(instance))), 1001)
+        for max_errors in [1, 5]:
+            with self.subTest(max_errors=max_errors):
+                validate = construct_validator(self.schema, max_errors=max_errors, two_phase=True)
+                found = errors(validate(instance))
+                self.assertEqual(len(found), max_errors)
+                self.assertEqual(found[0].location, "/items/0")
+
+    def test_number(self):
+        schema = {"items": {"minimum": 5, "multipleOf": 2}}
+        self.assertEqual(len(errors(construct_validator(schema)([3, 3]))), 4)
+        self.assertEqual(len(errors(construct_validator(schema, max_errors=1)([3, 3]))), 1)
+
+    def test_valid(self):
+        validate = construct_validator(self.schema, max_errors=1)
+        self.assertIs(validate({"items": ["a"], "name": "b"}), True)
+
+    def test_any_of_still_decided(self):
+        validate = construct_validator(
+            {"items": {"anyOf": [{"type": "string"}, {"type": "integer"}]}}, max_errors=1
+        )
+        self.assertIs(validate(["a", 1, "b"]), True)
+        self.assertFalse(validate(["a", None, "b"]))
+
+    def test_at_least_one(self):
+        with self.assertRaises(ValueError):
+            construct_validator(True, max_errors=0)
@@ -4,6 +4,7 @@ import parameterized
 
 from pyjschema.exceptions import SchemaError
 
+from .testing import build
 from .validator import Validator
 from .validator_construction import validate
 
@@ -45,6 +46,24 @@ class TestValidator(unittest.TestCase):
             Validator(schema={keyword: True}, location="", parent=None)
 
 
+class TestTypeDispatch(unittest.TestCase):
+    def setUp(self):
+        schema = {"minLength": 2, "minItems": 1, "maximum": 3, "enum": ["ab", [1], 1]}
+        self.validator = build(schema)
+
+    @parameterized.parameterized.expand(
+        [("ab", True), ("a", False), ([1], True), ([], False), (1, True), (4, False)]
+    )
+    def test(self, instance, result):
+        self.assertEqual(result, bool(self.validator(instance=instance, location="")))
+        self.assertEqual(result, self.validator.is_valid(instance=instance))
+
+    def test_only_applicable_keywords_are_used(self):
+        self.validator.is_valid(instance="abc")
+        # minLength and enum
+        self.assertEqual(len(self.validator._validators_by_type[str]), 2)
+
+
 class TestRecursiveRef(unittest.TestCase):
     @parameterized.parameterized.expand(
         [
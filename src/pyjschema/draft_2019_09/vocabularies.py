@@ -6,46 +6,33 @@ from .boolean_applicators import AllOf, AnyOf, IfElseThen, Not, OneOf
 from .defs import Defs
 from .ref import RecursiveRef, Ref
 from .types import Const, Enum
-from .types.array import _Contains, _Items, _MaxItems, _MinItems, _UniqueItems
-from .types.number import (
-    _ExclusiveMaximum,
-    _ExclusiveMinimum,
-    _Maximum,
-    _Minimum,
-    _MultipleOf,
-)
-from .types.object_ import (
-    _DependentRequired,
-    _MaxProperties,
-    _MinProperties,
-    _Property,
-    _PropertyNames,
-    _Required,
-)
-from .types.string import _MaxLength, _MinLength, _Pattern
+from .types.array import _Array
+from .types.number import _Number
+from .types.object_ import _Object
+from .types.string import _String
 from .types.type_ import Type
 
 CORE_VOCABULARY = {"$ref": Ref, "$recursiveRef": RecursiveRef, "$defs": Defs}
 
 VALIDATOR_VOCABULARY = {
-    "multipleOf": _MultipleOf,
-    "maximum": _Maximum,
-    "exclusiveMaximum": _ExclusiveMaximum,
-    "minimum": _Minimum,
-    "exclusiveMinimum": _ExclusiveMinimum,
-    "maxLength": _MaxLength,
-    "minLength": _MinLength,
-    "pattern": _Pattern,
-    "maxItems": _MaxItems,
-    "minItems": _MinItems,
-    "uniqueItems": _UniqueItems,
-    "contains": _Contains,
-    "maxContains": _Contains,
-    "minContains": _Contains,
-    "maxProperties": _MaxProperties,
-    "minProperties": _MinProperties,
-    "required": _Required,
-    "dependentRequired": _DependentRequired,
+    "multipleOf": _Number,
+    "maximum": _Number,
+    "exclusiveMaximum": _Number,
+    "minimum": _Number,
+    "exclusiveMinimum": _Number,
+    "maxLength": _String,
+    "minLength": _String,
+    "pattern": _String,
+    "maxItems": _Array,
+    "minItems": _Array,
+    "uniqueItems": _Array,
+    "contains": _Array,
+    "maxContains": _Array,
+    "minContains": _Array,
+    "maxProperties": _Object,
+    "minProperties": _Object,
+    "required": _Object,
+    "dependentRequired": _Object,
     "const": Const,
     "enum": Enum,
     "type": Type,
@@ -53,13 +40,13 @@ VALIDATOR_VOCABULARY = {
 
 
 APPLICATOR_VOCABULARY = {
-    "items": _Items,
-    "additionalItems": _Items,  # additionalItems only applies if items is defined
-    "contains": _Contains,
-    "additionalProperties": _Property,
-    "properties": _Property,
-    "patternProperties": _Property,
-    "propertyNames": _PropertyNames,
+    "items": _Array,
+    "additionalItems": _Array,  # additionalItems only applies if items is defined
+    "contains": _Array,
+    "additionalProperties": _Object,
+    "properties": _Object,
+    "patternProperties": _Object,
+    "propertyNames": _Object,
     "if": IfElseThen,
     "then": IfElseThen,
     "else": IfElseThen,
@@ -0,0 +1,119 @@
+"""
+Most patterns in real schemas are simple e.g "^x-" or "-id$". Those are matched with string methods
+instead of going through the regex engine. Character classes like "^[a-z]+$" are left to the regex engine
+since it is quicker at those than python code.
+Every matcher has the `pattern` and `search` of a compiled regex but search returns a bool.
+The semantics are python's re.search, in particular `$` also matches before a newline at the end.
+"""
+import re
+
+METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+# patterns that match every string
+MATCH_EVERYTHING = frozenset(["", ".*", "^.*", ".*$"])
+
+
+class Matcher:
+    pattern: str
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.pattern!r})"
+
+
+class Everything(Matcher):
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+
+    def search(self, string: str) -> bool:
+        return True
+
+
+class Contains(Matcher):
+    def __init__(self, pattern: str, literal: str):
+        self.pattern = pattern
+        self.literal = literal
+
+    def search(self, string: str) -> bool:
+        return self.literal in string
+
+
+class Prefix(Matcher):
+    def __init__(self, pattern: str, literal: str):
+        self.pattern = pattern
+        self.literal = literal
+
+    def search(self, string: str) -> bool:
+        return string.startswith(self.literal)
+
+
+class Suffix(Matcher):
+    def __init__(self, pattern: str, literal: str):
+        self.pattern = pattern
+        self.literals = (literal, literal + "\n")
+
+    def search(self, string: str) -> bool:
+        return string.endswith(self.literals)
+
+
+class Exact(Matcher):
+    def __init__(self, pattern: str, literal: str):
+        self.pattern = pattern
+        self.literals = frozenset([literal, literal + "\n"])
+
+    def search(self, string: str) -> bool:
+        return string in self.literals
+
+
+def compile_pattern(pattern: str):
+    "returns a matcher for the pattern - the compiled regex when it isn't one of the simple forms"
+    if pattern in MATCH_EVERYTHING:
+        return Everything(pattern)
+    starts = pattern.startswith("^")
+    ends = pattern.endswith("$") and not pattern.endswith("\\$")
+    literal = pattern[1 if starts else None:-1 if ends else None]
+    if not METACHARACTERS.intersection(literal):
+        if starts and ends:
+            return Exact(pattern, literal)
+        if starts:
+            return Prefix(pattern, literal)
+        if ends:
+            return Suffix(pattern, literal)
+        return Contains(pattern, literal)
+    return re.compile(pattern)
+
+
+class PatternSet:
+    """
+    Finds the patterns that match a string. All the patterns are combined into one prefilter so a string that
+    matches none of them - most keys for patternProperties like "^x-" - is rejected with a single search.
+    """
+
+    def __init__(self, regexes):
+        self.regexes = tuple(regexes)
+        self.prefilter = _prefilter(self.regexes) if len(self.regexes) > 1 else None
+
+    def matching(self, string: str):
+        if self.prefilter is not None and not self.prefilter(string):
+            return ()
+        return [regex for regex in self.regexes if regex.search(string)]
+
+
+# \1 in a pattern would refer to another pattern's group once they are combined
+BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def _prefilter(regexes):
+    "returns a function that is truthy for every string that one of the regexes matches or None if there isn't one"
+    if any(isinstance(regex, Everything) for regex in regexes):
+        return None
+    if all(isinstance(regex, Prefix) for regex in regexes):
+        prefixes = tuple(regex.literal for regex in regexes)
+        return lambda string: string.startswith(prefixes)
+    for regex in regexes:
+        compiled = re.compile(regex.pattern)
+        # inline flags like (?i) apply to the whole pattern so they can't be combined
+        if compiled.flags != re.UNICODE or BACKREFERENCE.search(regex.pattern):
+            return None
+    try:
+        return re.compile("|".join(f"(?:{regex.pattern})" for regex in regexes)).search
+    except re.error:
+        return None
@@ -0,0 +1,62 @@
+import re
+import unittest
+
+import parameterized
+
+from pyjschema import patterns
+from pyjschema.patterns import compile_pattern
+
+STRINGS = ["", "x-", "x-1", "a x-", "-x", "-x\n", "abc", "abc\n", "abc\n\n", "ABC", "a-b", "a\nb", "$", "axb"]
+
+
+class TestCompilePattern(unittest.TestCase):
+    @parameterized.parameterized.expand(
+        [
+            (".*", patterns.Everything),
+            ("^x-", patterns.Prefix),
+            ("x-", patterns.Contains),
+            ("-x$", patterns.Suffix),
+            ("^abc$", patterns.Exact),
+            ("^$", patterns.Exact),
+            ("^[a-z]+$", re.Pattern),
+            ("a.b", re.Pattern),
+            ("^[^a]+$", re.Pattern),
+            ("^\\$$", re.Pattern),
+        ]
+    )
+    def test_same_as_the_regex(self, pattern, cls):
+        matcher = compile_pattern(pattern)
+        self.assertIsInstance(matcher, cls)
+        self.assertEqual(matcher.pattern, pattern)
+        for string in STRINGS:
+            with self.subTest(string=string):
+                self.assertEqual(bool(matcher.search(string)), bool(re.search(pattern, string)))
+
+    def test_invalid_pattern(self):
+        with self.assertRaises(re.error):
+            compile_pattern("^[z-a]+$")
+
+
+class TestPatternSet(unittest.TestCase):
+    @parameterized.parameterized.expand(
+        [
+            ("prefixes", ["^x-", "^y-"]),
+            ("regexes", ["^x-", "[0-9]$", "^a+b"]),
+            ("everything", [".*", "^x-"]),
+            ("backreference", ["(a)\\1", "^x-"]),
+            ("inline flag", ["(?i)^X-", "^y-"]),
+        ]
+    )
+    def test(self, description, pattern_strings):
+        regexes = [compile_pattern(pattern) for pattern in pattern_strings]
+        pattern_set = patterns.PatternSet(regexes)
+        for string in STRINGS + ["x-a", "y-b", "aab", "x9", "X-Y", "aa"]:
+            with self.subTest(string=string):
+                self.assertEqual(
+                    list(pattern_set.matching(string)),
+                    [regex for regex in regexes if regex.search(string)],
+                )
+
+    def test_prefilter(self):
+        self.assertIsNotNone(patterns.PatternSet([compile_pattern("^x-"), compile_pattern("[0-9]$")]).prefilter)
+        self.assertIsNone(patterns.PatternSet([compile_pattern("(a)\\1"), compile_pattern("^x-")]).prefilter)
@@ -3,12 +3,17 @@ import contextvars
 import functools
 import json
 import os
-from dataclasses import dataclass, field
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple, Union
 
 from uritools import urijoin, urisplit
 
+from pyjschema.patterns import compile_pattern
+
 OUTPUT: contextvars.ContextVar = contextvars.ContextVar("output")
+# the ErrorBudget of the validation that is running, None when every error is collected
+ERROR_BUDGET: contextvars.ContextVar = contextvars.ContextVar("error_budget", default=None)
 
 
 def to_canonical_uri(current_base_uri, uri):
@@ -18,8 +23,11 @@ def to_canonical_uri(current_base_uri, uri):
 @contextlib.contextmanager
 def context(contextvar: contextvars.ContextVar, value):
     token = contextvar.set(value)
-    yield
-    contextvar.reset(token)
+    try:
+        yield
+    finally:
+        # also when validating raises, otherwise the value would still be set for whatever runs next
+        contextvar.reset(token)
 
 
 class SchemaLoader:
@@ -42,28 +50,186 @@ class SchemaLoader:
             raise Exception(f"Unable to locate this authority: {self.authority}")
 
 
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache:
+    "a bounded cache that drops the least recently used value when it is full. It is safe to share between threads"
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, compute: Callable[[], Any]):
+        "returns the value for the key, compute is called to work it out when it isn't cached"
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                self._values.move_to_end(key)
+                return self._values[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._values[key] = value
+            if len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return value
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            hits=self.hits, misses=self.misses, maxsize=self.maxsize, currsize=len(self._values)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self.hits = self.misses = 0
+
+
+# every schema built in this process shares compiled regexes e.g the same date or ID pattern in hundreds of schemas
+REGEX_CACHE = LRUCache(maxsize=1024)
+
+
+def compile_regex(pattern: str):
+    "returns a compiled regex or, for the simple patterns, a matcher with the same search - see patterns.py"
+    return REGEX_CACHE.get(pattern, lambda: compile_pattern(pattern))
+
+
 def validate_only(type_):
     "this is makes sure that we only validate instance of the correct type"
 
     def wrapper(validate):
         @functools.wraps(validate)
-        def wrapped_function(self, instance, location):
+        def wrapped_function(self, instance, **kwargs):
             if isinstance(instance, type_):
-                return validate(self=self, instance=instance, location=location)
+                return validate(self, instance=instance, **kwargs)
             else:
                 return True
 
+        # Validators use this to work out the types a keyword applies to without calling it
+        wrapped_function.type_ = type_  # type: ignore
         return wrapped_function
 
     return wrapper
 
 
-@dataclass
+# Where a value is in the instance - the string the validation started at ("" for the whole instance) or a
+# (location of the parent, key or index) pair. Making a pair is much cheaper than formatting a string, so validators
+# pass them down for every item and property and they are only rendered when a ValidationResult needs them.
+InstanceLocation = Union[str, Tuple[Any, Union[str, int]]]
+
+
+def render_location(location: InstanceLocation) -> str:
+    "the JSON Pointer of an instance location"
+    keys = []
+    while isinstance(location, tuple):
+        location, key = location
+        keys.append(key)
+    return location + "".join(f"/{escape_json_pointer(key)}" for key in reversed(keys))
+
+
+def escape_json_pointer(key: Union[str, int]) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+class ErrorBudget:
+    """
+    The number of errors a detailed validation can still collect, see max_errors in construct_validator.
+    Every ValidationResult without sub results spends one and the validators that collect results stop
+    once it is spent - what they found so far is returned.
+    """
+
+    __slots__ = ("remaining",)
+
+    def __init__(self, max_errors: int):
+        self.remaining = max_errors
+
+
+def errors_exhausted() -> bool:
+    budget = ERROR_BUDGET.get()
+    return budget is not None and budget.remaining <= 0
+
+
+def collect_failures(results: Iterable) -> List["ValidationResult"]:
+    "the failures among results - which should be lazy - stopping once the error budget is spent"
+    failures = []
+    for result in results:
+        if not result:
+            failures.append(result)
+            if errors_exhausted():
+                break
+    return failures
+
+
 class ValidationResult:
-    message: str
-    keywordLocation: str
-    location: str
-    sub_results: List["ValidationResult"] = field(default_factory=list)
+    """
+    A failed validation.
+    The message can be a str.format template, it is filled in with the arguments the first time it is read and the
+    location is rendered the first time it is read. Most callers only check whether the instance is valid so
+    the repr of a large instance isn't formatted for them.
+    """
+
+    __slots__ = ("_message", "_arguments", "keywordLocation", "_location", "sub_results")
+
+    def __init__(
+        self,
+        message: str,
+        keywordLocation: str,
+        location: InstanceLocation,
+        sub_results: Optional[List["ValidationResult"]] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+    ):
+        self._message = message
+        self._arguments = arguments
+        self.keywordLocation = keywordLocation
+        self._location = location
+        self.sub_results = [] if sub_results is None else sub_results
+        if not self.sub_results:
+            budget = ERROR_BUDGET.get()
+            if budget is not None:
+                budget.remaining -= 1
+
+    @property
+    def message(self) -> str:
+        if self._arguments is not None:
+            self._message = self._message.format(**self._arguments)
+            self._arguments = None
+        return self._message
+
+    @message.setter
+    def message(self, message: str):
+        self._message = message
+        self._arguments = None
+
+    @property
+    def location(self) -> str:
+        if isinstance(self._location, tuple):
+            self._location = render_location(self._location)
+        return self._location
+
+    @location.setter
+    def location(self, location: InstanceLocation):
+        self._location = location
 
     def __bool__(self):
         return False
+
+    def __eq__(self, other):
+        return isinstance(other, ValidationResult) and (
+            self.message, self.keywordLocation, self.location, self.sub_results
+        ) == (other.message, other.keywordLocation, other.location, other.sub_results)
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        return (
+            f"ValidationResult(message={self.message!r}, keywordLocation={self.keywordLocation!r}, "
+            f"location={self.location!r}, sub_results={self.sub_results!r})"
+        )
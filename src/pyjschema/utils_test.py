@@ -4,6 +4,9 @@ import parameterized
 
 from pyjschema.utils import to_canonical_uri
 from pyjschema.utils import SchemaLoader
+from pyjschema.utils import LRUCache, REGEX_CACHE, compile_regex
+from pyjschema.utils import ValidationResult, render_location
+from pyjschema.utils import ERROR_BUDGET, ErrorBudget, context
 
 
 class TestToCanonicalURI(unittest.TestCase):
@@ -74,3 +77,74 @@ class TestGetSchemaLoader(TestSchemaLoader):
     def test(self, uri):
         schema = self.schema_loader.get(uri)
         assert schema
+
+
+class TestLRUCache(unittest.TestCase):
+    def test(self):
+        cache = LRUCache(maxsize=2)
+        self.assertEqual(cache.get("a", lambda: 1), 1)
+        self.assertEqual(cache.get("b", lambda: 2), 2)
+        self.assertEqual(cache.get("a", lambda: "not called"), 1)
+        # b is the least recently used so it is the one that is dropped
+        cache.get("c", lambda: 3)
+        self.assertEqual(cache.get("b", lambda: "computed again"), "computed again")
+        self.assertEqual(cache.get("a", lambda: "computed again"), "computed again")
+        self.assertEqual(tuple(cache.info()), (1, 5, 2, 2))
+
+    def test_clear(self):
+        cache = LRUCache(maxsize=2)
+        cache.get("a", lambda: 1)
+        cache.clear()
+        self.assertEqual(tuple(cache.info()), (0, 0, 2, 0))
+
+
+class TestCompileRegex(unittest.TestCase):
+    def test_compiled_once(self):
+        hits = REGEX_CACHE.info().hits
+        self.assertIs(compile_regex("^[a-z]+-[0-9]+$"), compile_regex("^[a-z]+-[0-9]+$"))
+        self.assertEqual(REGEX_CACHE.info().hits, hits + 1)
+
+
+class TestInstanceLocation(unittest.TestCase):
+    def test(self):
+        self.assertEqual(render_location(((("", "a/b"), 0), "m~n")), "/a~1b/0/m~0n")
+        self.assertEqual(render_location(("/root", "a")), "/root/a")
+        self.assertEqual(render_location(""), "")
+
+    def test_rendered_for_validation_results(self):
+        result = ValidationResult(message="", keywordLocation="", location=("", "a"))
+        self.assertEqual(result.location, "/a")
+
+
+class TestValidationResult(unittest.TestCase):
+    def test_message_formatted_when_read(self):
+        instance = _Repr()
+        result = ValidationResult(
+            message="{instance!r} is not a {value}", keywordLocation="/type", location="", arguments={"instance": instance, "value": "string"}
+        )
+        self.assertEqual(instance.calls, 0)
+        self.assertEqual(result.message, "<instance> is not a string")
+        self.assertEqual(result.message, "<instance> is not a string")
+        self.assertEqual(instance.calls, 1)
+
+    def test_equal(self):
+        self.assertEqual(
+            ValidationResult(message="{value}", keywordLocation="", location=("", "a"), arguments={"value": 1}),
+            ValidationResult(message="1", keywordLocation="", location="/a"),
+        )
+
+
+class TestContext(unittest.TestCase):
+    def test_reset_when_raising(self):
+        with self.assertRaises(RecursionError):
+            with context(ERROR_BUDGET, ErrorBudget(1)):
+                raise RecursionError()
+        self.assertIsNone(ERROR_BUDGET.get())
+
+
+class _Repr:
+    calls = 0
+
+    def __repr__(self):
+        self.calls += 1
+        return "<instance>"
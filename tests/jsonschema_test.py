@@ -5,7 +5,7 @@ import unittest
 
 import parameterized
 
-from pyjschema.draft_2019_09 import validate
+from pyjschema.draft_2019_09 import construct_validator, validate
 
 STRING_KEYWORDS = [
     "minLength",
@@ -87,3 +87,41 @@ class Test(unittest.TestCase):
                 self.assertEqual(
                     bool(validate(schema, instance=test["data"])), test["valid"]
                 )
+
+    @parameterized.parameterized.expand(
+        [(test["keyword"] + test["description"], test) for test in KEYWORD_TESTS]
+    )
+    def tests_codegen(self, description, testcase):
+        validate = construct_validator(testcase["schema"], mode="codegen")
+        for test in testcase["tests"]:
+            with self.subTest(test["description"]):
+                self.assertEqual(bool(validate(test["data"])), test["valid"])
+
+    @parameterized.parameterized.expand(
+        [(test["keyword"] + test["description"], test) for test in KEYWORD_TESTS]
+    )
+    def tests_is_valid(self, description, testcase):
+        for mode in ["interpreted", "codegen"]:
+            validate = construct_validator(testcase["schema"], mode=mode)
+            for test in testcase["tests"]:
+                with self.subTest(mode=mode, description=test["description"]):
+                    self.assertIs(validate.is_valid(test["data"]), test["valid"])
+
+    @parameterized.parameterized.expand(
+        [(test["keyword"] + test["description"], test) for test in KEYWORD_TESTS]
+    )
+    def tests_two_phase(self, description, testcase):
+        validate = construct_validator(testcase["schema"], two_phase=True)
+        for test in testcase["tests"]:
+            with self.subTest(test["description"]):
+                self.assertEqual(bool(validate(test["data"])), test["valid"])
+
+    @parameterized.parameterized.expand(
+        [(test["keyword"] + test["description"], test) for test in KEYWORD_TESTS]
+    )
+    def tests_optimized(self, description, testcase):
+        for mode in ["interpreted", "codegen"]:
+            validate = construct_validator(testcase["schema"], mode=mode, optimize=True)
+            for test in testcase["tests"]:
+                with self.subTest(test["description"], mode=mode):
+                    self.assertEqual(bool(validate(test["data"])), test["valid"])